@@ -0,0 +1,39 @@
+from matrix_library import shapes as s, canvas as c
+import time
+import tracemalloc
+
+canvas = c.Canvas(limitFps=False)
+frame_bytes = canvas.width * canvas.height * 3
+
+title = s.Phrase("FRAMES", (0, 0), (255, 255, 255), size=2)
+box = s.Polygon(s.get_polygon_vertices(4, 20, (64, 80)), (0, 120, 255))
+
+
+def frame(i):
+    if i % 2:
+        canvas.fill((20, 0, 40))
+    else:
+        canvas.clear()
+    canvas.add(title)
+    canvas.add(box)
+    canvas.draw()
+
+
+# Warm up so the mask caches and the backend are settled
+for i in range(20):
+    frame(i)
+
+allocations = canvas.frame_allocations
+tracemalloc.start()
+start = time.perf_counter()
+for i in range(500):
+    frame(i)
+elapsed = time.perf_counter() - start
+current, peak = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+
+print(f"Average frame: {elapsed / 500 * 1000:.3f} ms")
+print(f"Frame buffers allocated: {canvas.frame_allocations} ({canvas.frame_allocations - allocations} while drawing)")
+print(f"Peak traced memory while drawing: {peak} bytes (one frame is {frame_bytes} bytes)")
+assert canvas.frame_allocations == allocations, "a frame buffer was allocated while drawing"
+assert peak < frame_bytes, "drawing allocated a frame-sized buffer"
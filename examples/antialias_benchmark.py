@@ -0,0 +1,42 @@
+from matrix_library import shapes as s, canvas as c, raster as r
+import time
+
+canvas = c.Canvas(limitFps=False)
+
+# Measure rasterization itself, not stamps served from the shared cache
+r.shared_cache.configure(enabled=False)
+
+
+def make_shapes(antialias):
+    shapes = []
+    for sides, center in zip(range(3, 8), [(32, 32), (96, 32), (64, 64), (32, 96), (96, 96)]):
+        shapes.append(s.Polygon(s.get_polygon_vertices(sides, 14, center), (255, 0, 0), antialias=antialias))
+        shapes.append(s.PolygonOutline(s.get_polygon_vertices(sides, 20, center), (0, 255, 0), 2, antialias=antialias))
+    shapes.append(s.Circle(10, (64.25, 20.5), (0, 0, 255), antialias=antialias))
+    shapes.append(s.CircleOutline(30, (64, 64), (255, 255, 0), 2, antialias=antialias))
+    shapes.append(s.Line([10, 120], [118, 80], (0, 255, 255), thickness=1.5, antialias=antialias))
+    shapes.append(s.Line([10, 80], [118, 120], (255, 0, 255), thickness=1.5, cap="round", antialias=antialias))
+    return shapes
+
+
+def spin(shapes, frames=500):
+    frame_times = []
+    for i in range(frames):
+        frame_start = time.perf_counter()
+        canvas.clear()
+        for shape in shapes:
+            if isinstance(shape, s.Polygon):
+                shape.rotate(1, (shape.center[0], shape.center[1]))
+            else:
+                shape.translate(0.25, 0)
+            canvas.add(shape)
+        frame_times.append(time.perf_counter() - frame_start)
+    return sum(frame_times) / len(frame_times)
+
+
+aliased_frame_time = spin(make_shapes(False))
+antialiased_frame_time = spin(make_shapes(True))
+
+print(f"Aliased frame: {aliased_frame_time * 1000:.3f} ms")
+print(f"Anti-aliased frame: {antialiased_frame_time * 1000:.3f} ms")
+print(f"Anti-aliasing cost: {antialiased_frame_time / aliased_frame_time:.2f}x")
@@ -1,23 +1,33 @@
 from matrix_library import shapes as s, canvas as c
 from datetime import datetime
+import math
 import time
 
 canvas = c.Canvas()
-circle = s.CircleOutline(64, (64, 64), (255, 255, 255))
 
-markers = []
+# The face never changes, so it is rasterized once into a static layer
+face = canvas.add_layer("face", static=True)
+face.add(s.CircleOutline(64, (64, 64), (255, 255, 255)))
+
 for i in range(12):
     marker = s.Line((64, 16), (64, 8), (255, 255, 255))
     marker.rotate(i * 30, (64, 64))
-    markers.append(marker)
+    face.add(marker)
+
+# The hands are built once and moved with set_endpoints every tick
+hour_hand = s.Line((64, 64), (64, 24), (255, 0, 0))
+minute_hand = s.Line((64, 64), (64, 20), (0, 255, 0))
+second_hand = s.Line((64, 64), (64, 16), (0, 0, 255))
+
+
+def hand_end(angle, length):
+    radians = math.radians(angle)
+    return (64 + length * math.sin(radians), 64 - length * math.cos(radians))
+
 
 while True:
     canvas.clear()
 
-    hour_hand = s.Line((64, 64), (64, 24), (255, 0, 0))
-    minute_hand = s.Line((64, 64), (64, 20), (0, 255, 0))
-    second_hand = s.Line((64, 64), (64, 16), (0, 0, 255))
-
     now = datetime.now()
     hour = now.hour
     minute = now.minute
@@ -28,14 +38,9 @@ while True:
     minute_angle = minute * 6 + (second / 60) * 6
     second_angle = second * 6 + (millisecond / 1000) * 6
 
-    hour_hand.rotate(hour_angle, (64, 64))
-    minute_hand.rotate(minute_angle, (64, 64))
-    second_hand.rotate(second_angle, (64, 64))
-
-    canvas.add(circle)
-
-    for marker in markers:
-        canvas.add(marker)
+    hour_hand.set_endpoints((64, 64), hand_end(hour_angle, 40))
+    minute_hand.set_endpoints((64, 64), hand_end(minute_angle, 44))
+    second_hand.set_endpoints((64, 64), hand_end(second_angle, 48))
 
     canvas.add(hour_hand)
     canvas.add(minute_hand)
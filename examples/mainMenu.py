@@ -7,17 +7,19 @@ from evdev import InputDevice, categorize, ecodes
 gamepad = InputDevice("/dev/input/event2")
 canvas = c.Canvas()
 
-# Create shapes and phrases
-square = s.Polygon(s.get_polygon_vertices(4, 60, (0, 100)), (100, 200, 100))
-headerline = s.Line((3, 28), (115, 28), (255, 255, 255), thickness=1)
-menuheader = s.Phrase("MENU", (2, 0), (255, 255, 255), size=3.5, auto_newline=True)
-demoheader = s.Phrase("Demos", (0, 33), (255, 255, 255), size=3, auto_newline=True)
-gamesheader = s.Phrase("Games", (0, 60), (255, 255, 255), size=3, auto_newline=True)
+# Create shapes and phrases; the ones that never move go in a static layer
+# that is rasterized once and copied in by every canvas.clear()
+background = canvas.add_layer("background", static=True)
+square = background.add(s.Polygon(s.get_polygon_vertices(4, 60, (0, 100)), (100, 200, 100)))
+headerline = background.add(s.Line((3, 28), (115, 28), (255, 255, 255), thickness=1))
+menuheader = background.add(s.Phrase("MENU", (2, 0), (255, 255, 255), size=3.5, auto_newline=True))
+demoheader = background.add(s.Phrase("Demos", (0, 33), (255, 255, 255), size=3, auto_newline=True))
+gamesheader = background.add(s.Phrase("Games", (0, 60), (255, 255, 255), size=3, auto_newline=True))
+controller = background.add(s.Polygon(s.get_polygon_vertices(4, 30, (5, 150)), (0, 0, 255)))
+controller2 = background.add(s.Polygon(s.get_polygon_vertices(4, 30, (20, 150)), (0, 0, 255)))
 creatornames = s.Phrase(
     "created by Alex Ellie and Palmer", (0, 100), (255, 255, 255), size=1
 )
-controller = s.Polygon(s.get_polygon_vertices(4, 30, (5, 150)), (0, 0, 255))
-controller2 = s.Polygon(s.get_polygon_vertices(4, 30, (20, 150)), (0, 0, 255))
 
 # Countdown setup
 countdown_value = 30  # Start countdown from 30
@@ -109,14 +111,7 @@ while True:
 
         # Draw everything
         canvas.clear()
-        canvas.add(square)
-        canvas.add(headerline)
-        canvas.add(menuheader)
-        canvas.add(demoheader)
-        canvas.add(gamesheader)
         canvas.add(creatornames)
-        canvas.add(controller)
-        canvas.add(controller2)
         canvas.add(countdown_display)  # Draw the countdown display
         canvas.add(outline_box)  # Add the green outline box
         canvas.draw()
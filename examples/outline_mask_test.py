@@ -0,0 +1,20 @@
+from matrix_library import shapes as s
+import numpy as np
+
+# Outline masks are rings, not filled shapes: the pixel counts below are the
+# ones get_polygon_mask gave before polygons were triangulated
+expected = {
+    "hexagon outline": (s.PolygonOutline(s.get_polygon_vertices(6, 30, (64, 64)), thickness=3), 410),
+    "square outline": (s.PolygonOutline(s.get_polygon_vertices(4, 20, (40, 90)), thickness=1), 78),
+    "circle outline": (s.CircleOutline(40, (64, 64), thickness=2), 512),
+    "small circle outline": (s.CircleOutline(12, (20, 20), thickness=4), 244),
+}
+
+ys, xs = np.mgrid[0:128, 0:128]
+grid = np.column_stack((xs.ravel(), ys.ravel()))
+
+for name, (shape, count) in expected.items():
+    mask = shape.get_polygon_mask((128, 128))
+    print(f"{name}: {int(mask.sum())} pixels (expected {count})")
+    assert mask.sum() == count, f"{name} mask has {int(mask.sum())} pixels, expected {count}"
+    assert np.array_equal(mask, shape.contains_points(grid).reshape(128, 128)), f"{name} mask disagrees with contains_points"
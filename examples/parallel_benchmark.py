@@ -0,0 +1,107 @@
+from matrix_library import shapes as s, canvas as c, raster as r
+import numpy as np
+import os
+import sys
+import time
+
+# Times add_many() on a thread pool against the same frames drawn on one thread.
+# The batch is split into bands of the canvas ("tiles", the default) or into one
+# task per item ("items")
+split = sys.argv[1] if len(sys.argv) > 1 else "tiles"
+if split not in ("tiles", "items"):
+    print("Usage: python parallel_benchmark.py [tiles|items]")
+    sys.exit(1)
+
+# Measure rasterization itself, not stamps served from the shared cache
+r.shared_cache.configure(enabled=False)
+
+WIDTH, HEIGHT = 384, 192
+centers = [(x, y) for y in (16, 48, 80, 112) for x in (16, 40, 64, 88, 112)]
+
+
+def rotate_shapes():
+    rng = np.random.default_rng(0)
+    shapes = []
+    for i in range(60):
+        center = (rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+        color = tuple(int(v) for v in rng.integers(0, 256, 3))
+        kind = i % 4
+        if kind == 0:
+            shapes.append(s.Polygon(s.get_polygon_vertices(int(rng.integers(3, 9)), rng.uniform(10, 50), center), color))
+        elif kind == 1:
+            shapes.append(s.Polygon(s.get_polygon_vertices(5, rng.uniform(10, 40), center), color, antialias=True))
+        elif kind == 2:
+            shapes.append(s.Circle(rng.uniform(5, 40), center, color, antialias=True))
+        else:
+            shapes.append(s.PolygonOutline(s.get_polygon_vertices(6, rng.uniform(10, 40), center), color, 2, antialias=True))
+
+    def step():
+        for shape in shapes:
+            shape.rotate(2, (shape.center[0], shape.center[1]))
+        return shapes
+    return step
+
+
+def spin_outlines():
+    outlines = [
+        s.PolygonOutline(s.get_polygon_vertices(3 + i % 5, 14, center), (255, 40 * (i % 6), 0), 2)
+        for i, center in enumerate(centers)
+    ]
+
+    def step():
+        for outline in outlines:
+            outline.rotate(1, (outline.center[0], outline.center[1]))
+        return outlines
+    return step
+
+
+def scroll_phrases():
+    phrases = [s.Phrase("SCROLL", [0, y], (0, 255, 128), size=3) for y in range(0, 128, 26)]
+
+    def step():
+        for i, phrase in enumerate(phrases):
+            phrase.translate(-0.5 - 0.25 * i, 0)
+            if phrase.x_max < 0:
+                phrase.set_position([128, phrase.position[1]])
+        return phrases
+    return step
+
+
+def drift_images():
+    rng = np.random.default_rng(0)
+    images = []
+    for center in centers[::2]:
+        image = s.ColoredBitMap([], 16, 16, position=[center[0] - 12, center[1] - 12], scale=1.5)
+        image.set_arrays(rng.integers(0, 256, (16, 16, 3), dtype=np.uint8))
+        images.append(image)
+
+    def step():
+        for image in images:
+            image.translate(0.3, 0.1)
+        return images
+    return step
+
+
+def run(threads, scene, frames=100):
+    with c.Canvas(limitFps=False, width=WIDTH, height=HEIGHT, threads=threads, split=split) as canvas:
+        step = scene()
+        frame_times = []
+        for i in range(frames):
+            items = step()
+            frame_start = time.perf_counter()
+            canvas.clear()
+            canvas.add_many(items)
+            frame_times.append(time.perf_counter() - frame_start)
+        return sum(frame_times) / len(frame_times), canvas.canvas.copy()
+
+
+print(f"{os.cpu_count()} CPU cores, {WIDTH}x{HEIGHT} canvas, split into {split}")
+for name, scene in [("Rotate mixed shapes", rotate_shapes), ("Spin polygon outlines", spin_outlines), ("Scroll phrases", scroll_phrases), ("Drift images", drift_images)]:
+    single_frame_time, single_frame = run(0, scene)
+    print(f"{name}: single-threaded {single_frame_time * 1000:.3f} ms")
+    for threads in (1, 2, 4):
+        frame_time, frame = run(threads, scene)
+        print(
+            f"  {threads} thread(s): {frame_time * 1000:.3f} ms "
+            f"({single_frame_time / frame_time:.2f}x, identical: {np.array_equal(frame, single_frame)})"
+        )
@@ -0,0 +1,36 @@
+from matrix_library import shapes as s, RenderPipeline
+import numpy as np
+import time
+
+# The program only moves the shapes and submits them; rasterizing and
+# presenting happen in the render process, on another core
+if __name__ == "__main__":
+    with RenderPipeline((0, 0, 30), limitFps=True, fps=60) as pipeline:
+        # Positions are kept in floats; Circle.translate moves by whole pixels only
+        positions = [(10.0 + 12 * i, 20.0 + 9 * i) for i in range(8)]
+        velocities = [(1.5 + 0.2 * i, 1.1 - 0.1 * i) for i in range(8)]
+        balls = [s.Circle(6, position, (255, 30 * i, 0), antialias=True) for i, position in enumerate(positions)]
+        title = s.Phrase("PIPELINE", (0, 0), (255, 255, 255), size=2)
+        counter = s.Phrase("0", (0, 112), (255, 255, 0), size=2)
+
+        start = time.perf_counter()
+        while True:
+            for i, ball in enumerate(balls):
+                dx, dy = velocities[i]
+                x, y = positions[i]
+                if not 6 <= x + dx <= 122:
+                    dx = -dx
+                if not 22 <= y + dy <= 106:
+                    dy = -dy
+                velocities[i] = (dx, dy)
+                positions[i] = (x + dx, y + dy)
+
+                # Rounded only to draw
+                ball.center = np.array([round(x + dx), round(y + dy)])
+
+            counter.set_text(str(pipeline.presented))
+            pipeline.submit([title, counter] + balls)
+
+            if pipeline.frame_count % 300 == 0:
+                elapsed = time.perf_counter() - start
+                print(f"{pipeline.frame_count} frames submitted, {pipeline.presented} presented, {pipeline.frame_count / elapsed:.1f} fps")
@@ -0,0 +1,43 @@
+from matrix_library import shapes as s, canvas as c
+import time
+
+# Spin polygons as in benchmark.py, once per way of presenting. The presenter
+# thread only runs on the led and zmq backends; a pygame window falls back to
+# "sync", so the other modes are skipped there
+for present, buffers in [("sync", 2), ("block", 3), ("drop", 3)]:
+    canvas = c.Canvas(limitFps=False, buffers=buffers, present=present)
+    if canvas.present != present:
+        print(f"present={present}: skipped, the {canvas.render} backend always presents inside draw()")
+        canvas.close()
+        continue
+
+    polygons = [
+        s.Polygon(s.get_polygon_vertices(sides, 20, center), color)
+        for sides, center, color in [
+            (3, (32, 32), (255, 0, 0)), (4, (96, 32), (0, 255, 0)), (5, (64, 64), (0, 0, 255)),
+            (6, (32, 96), (255, 255, 0)), (7, (96, 96), (0, 255, 255)),
+        ]
+    ]
+
+    draw_times = []
+    latencies = []
+    frame_start = time.perf_counter()
+    for i in range(1000):
+        canvas.clear()
+        for polygon in polygons:
+            polygon.rotate(1, (polygon.center[0], polygon.center[1]))
+            canvas.add(polygon)
+
+        draw_start = time.perf_counter()
+        canvas.draw()
+        draw_times.append(time.perf_counter() - draw_start)
+        latencies.append(canvas.present_latency)
+    if present != "sync":
+        canvas.wait_presented()
+    frame_time = (time.perf_counter() - frame_start) / 1000
+    canvas.close()
+
+    print(f"present={present} ({buffers} buffers)")
+    print(f"  Average frame: {frame_time * 1000:.3f} ms, draw(): {sum(draw_times) / len(draw_times) * 1000:.3f} ms")
+    print(f"  Average present latency: {sum(latencies) / len(latencies) * 1000:.3f} ms")
+    print(f"  Frames presented: {canvas.frames_presented}, dropped: {canvas.frames_dropped}")
@@ -0,0 +1,34 @@
+from matrix_library import shapes as s, canvas as c, Scene
+import time
+
+canvas = c.Canvas()
+
+# Everything is added to the scene once; each frame only the countdown
+# and the spinning marker change, so only their regions are repainted
+scene = Scene(canvas, (0, 0, 30))
+scene.add(s.Polygon(s.get_polygon_vertices(4, 60, (0, 100)), (100, 200, 100)))
+scene.add(s.Line((3, 28), (115, 28), (255, 255, 255), thickness=1))
+scene.add(s.Phrase("MENU", (2, 0), (255, 255, 255), size=3))
+scene.add(s.Phrase("Demos", (0, 33), (255, 255, 255), size=2))
+scene.add(s.Phrase("Games", (0, 60), (255, 255, 255), size=2))
+
+marker = scene.add(s.Polygon(s.get_polygon_vertices(3, 8, (110, 44)), (255, 0, 0)), z=1)
+countdown = scene.add(s.Phrase("30", (110, 120), (255, 255, 0)), z=1)
+
+start = time.perf_counter()
+render_time = 0
+frames = 0
+while True:
+    remaining = 30 - int(time.perf_counter() - start) % 31
+    if countdown.text != str(remaining):
+        countdown.set_text(str(remaining))
+    marker.rotate(6, marker.center)
+
+    render_start = time.perf_counter()
+    scene.render()
+    render_time += time.perf_counter() - render_start
+    frames += 1
+    if frames % 300 == 0:
+        print(f"Average scene render: {render_time / frames * 1000:.3f} ms")
+
+    canvas.draw()
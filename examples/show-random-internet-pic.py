@@ -32,10 +32,7 @@ for i in range(0,3):
         r = requests.get(url, stream=True, timeout=2)
         if r.status_code == 200:
             img = Image.open(io.BytesIO(r.content))
-            pixels = list(img.getdata())
-            #print(pixels)
-            img = matrix.Image(width=128,height=128,position=[0,0])
-            img.loadpixels(pixels)
+            img = matrix.Image.from_pil(img, position=[0,0])
 
             canvas.add(img)
             canvas.draw()
@@ -0,0 +1,60 @@
+from matrix_library import shapes as s, raster as r
+import numpy as np
+import time
+
+
+def gear(teeth, center=(64, 64)):
+    """A concave icon: a wheel with square teeth, 4 vertices per tooth."""
+    angles = np.linspace(0, 2 * np.pi, teeth * 4, endpoint=False)
+    radii = np.tile([40, 55, 55, 40], teeth)
+    return np.column_stack((center[0] + radii * np.cos(angles), center[1] + radii * np.sin(angles)))
+
+
+def timed(function, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def ray_casting(function):
+    """Run function with the triangulation switched off for point tests."""
+    threshold = r.TRIANGULATE_MIN_VERTICES
+    r.TRIANGULATE_MIN_VERTICES = np.iinfo(np.int64).max
+    try:
+        return function()
+    finally:
+        r.TRIANGULATE_MIN_VERTICES = threshold
+
+
+rng = np.random.default_rng(0)
+points = rng.uniform(0, 128, (20000, 2))
+ys, xs = np.mgrid[0:128, 0:128]
+grid = np.column_stack((xs.ravel(), ys.ravel()))
+
+shapes = {
+    "hexagon": s.Polygon(s.get_polygon_vertices(6, 55, (64, 64))),
+    "gear, 16 teeth": s.Polygon(gear(16)),
+    "gear, 40 teeth": s.Polygon(gear(40)),
+    "circle, 240 sides": s.Polygon(s.get_polygon_vertices(240, 60, (64, 64))),
+}
+
+for name, polygon in shapes.items():
+    # Spin the shape a little: the triangulation is built once and follows it
+    polygon.rotate(7)
+    triangulate_time, _ = timed(lambda: r.triangulate(polygon.vertices), 5)
+
+    point_time, inside = timed(lambda: polygon.contains_points(points))
+    ray_time, ray_inside = ray_casting(lambda: timed(lambda: polygon.contains_points(points)))
+    mask_time, mask = timed(lambda: polygon.get_polygon_mask((128, 128)))
+    grid_time, grid_inside = ray_casting(lambda: timed(lambda: polygon.contains_points(grid)))
+
+    print(f"{name} ({len(polygon.vertices)} vertices, triangulated in {triangulate_time * 1000:.2f} ms)")
+    print(
+        f"  contains_points: {point_time * 1000:.2f} ms, ray casting {ray_time * 1000:.2f} ms "
+        f"(identical: {np.array_equal(inside, ray_inside)})"
+    )
+    print(
+        f"  get_polygon_mask: {mask_time * 1000:.2f} ms, ray casting every pixel {grid_time * 1000:.2f} ms "
+        f"(identical: {np.array_equal(mask, grid_inside.reshape(128, 128))})"
+    )
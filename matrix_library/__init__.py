@@ -1,3 +1,5 @@
 from .canvas import Canvas
 from .shapes import *
 from .controller import Controller
+from .scene import Scene
+from .pipeline import RenderPipeline
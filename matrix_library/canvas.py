@@ -1,5 +1,9 @@
 import numpy as np
-from matrix_library import shapes as s, controller as ctrl
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from matrix_library import shapes as s, controller as ctrl, raster as r, composite
+from matrix_library.layer import Layer
 import time
 from PIL import Image
 import platform
@@ -16,27 +20,95 @@ if not (re.search("armv|aarch64",platform.machine()) and re.search("csledpi",pla
     import pygame
 
 class Canvas:
-    def __init__(self, backgroundcolor=(0, 0, 0), fps=30, limitFps=True, renderMode="", zmqRenderTarget="localhost", zmqRenderPort="55000"):
+    def __init__(self, backgroundcolor=(0, 0, 0), fps=30, limitFps=True, renderMode="", zmqRenderTarget="localhost", zmqRenderPort="55000", buffers=2, width=128, height=128, panel_size=(64, 64), parallel=1, threads=0, tile_height=None, split="tiles", present="sync"):
         """
         Initializes a Canvas object with the specified color.
 
         Parameters:
         - color (tuple): The RGB color value to fill the canvas with. Defaults to (0, 0, 0, 255).
+        - buffers (int): The number of preallocated frames to cycle through (2 for double
+          buffering, 3 for triple buffering). Defaults to 2.
+        - width (int): The width of the canvas in pixels. Defaults to 128.
+        - height (int): The height of the canvas in pixels. Defaults to 128.
+        - panel_size (tuple): The (width, height) of one LED panel, for the led backend.
+          Defaults to (64, 64).
+        - parallel (int): The number of parallel panel chains, for the led backend. Defaults to 1.
+        - threads (int): Rasterize add_many() batches on this many threads. Defaults to 0
+          (no thread pool). close(), or leaving a with block, shuts the pool down.
+        - tile_height (int): The height of the full-width tiles used with threads. Defaults to
+          None (the canvas split evenly between the threads).
+        - split (str): How add_many() shares a batch between the threads: "tiles" (bands of
+          the canvas) or "items" (one task per item, composited in order). Defaults to "tiles".
+        - present (str): "sync" to present each frame inside draw(), or hand frames to a
+          presenter thread that owns the backend: "block" waits in draw() while every
+          spare buffer is still queued, "drop" drops the oldest queued frame instead
+          (with buffers=3 or more, draw() then never waits). The queue holds up to
+          buffers - 1 frames. The led and zmq backends only: with the pygame backend,
+          "block" and "drop" fall back to "sync" (and present reads "sync"), since the
+          window has to be presented on the thread that created it. Defaults to "sync".
 
         Attributes:
         - color (tuple): The RGB color value used to fill the canvas.
-        - canvas (ndarray): The 4-dimensional NumPy array representing the canvas. RGB+alpha (always 255)
+        - canvas (ndarray): The frame being drawn, a (height, width, 3) uint8 array indexed [y, x].
+          Only the rectangles that changed are presented, and writes to this array can't be
+          tracked, so the frame after it is read is presented whole. A reference kept across
+          draw() calls is not seen; call mark_dirty() after writing through one.
+        - front (ndarray): The frame most recently drawn.
+        - frame_allocations (int): How many frame-sized buffers the canvas has allocated.
         - points (list): The list of points on the canvas.
+        - damage (list): The (x0, y0, x1, y1) rectangles (x1/y1 exclusive) that changed
+          in the frame most recently drawn.
+        - layers (dict): The named layers drawn under the canvas content (see add_layer).
+        - present_latency (float): Seconds from draw() handing the latest presented frame
+          over to the backend finishing with it.
+        - frames_presented (int): The number of frames the backend has shown.
+        - frames_dropped (int): The number of frames dropped before they were shown.
 
         Returns:
         None
         """
         self.color = backgroundcolor
-        self.width = 128
-        self.height = 128
-        self.canvas = np.zeros([self.width, self.height, 3], dtype=np.uint8)
-        self.canvas[:, :] = self.color
+        self.width = width
+        self.height = height
+
+        # Preallocated frames: the program draws into the back frame while the
+        # front frame is the one last handed to the backend; draw() swaps them
+        self.frame_allocations = 0
+        self._frames = [self._allocate_frame() for _ in range(max(2, buffers))]
+        for frame in self._frames:
+            frame[:, :] = self.color
+        self._back = 0
+        self._front = len(self._frames) - 1
+        self._frame_numbers = [0] * len(self._frames)
+        self._damage_history = deque(maxlen=len(self._frames))
+        self._needs_sync = False
         self.points = self.get_points()
+
+        # Damage tracking: what changed since the last draw, and the boxes of
+        # everything drawn since the canvas was last cleared or filled
+        self.damage = []
+        self._background = None
+        self._pending_damage = [(0, 0, self.width, self.height)]
+        self._content_boxes = []
+        self._previous_damage = []
+        self._repaints = 0
+
+        # Set when the frame is handed out through the canvas property, which can write anywhere
+        self._untracked = False
+
+        # Layers, and the background plus static layers cached as one frame
+        self.layers = {}
+        self._base = None
+        self._base_key = None
+
+        # Reusable RGBA frame for the zmq backend
+        self._rgba = None
+
+        # Parallel rasterization for add_many; the pool is started on first use
+        self.threads = threads
+        self.tile_height = tile_height
+        self.split = split
+        self._pool = None
         self.prev_frame_time = time.perf_counter()
         self.frame_count = 0
         self.fps = fps
@@ -71,17 +143,19 @@ class Canvas:
             self.socket = self.context.socket(zmq.REQ)
             self.socket.connect(f"tcp://{self.zmqRenderTarget}:{self.zmqRenderPort}")
 
+            # The server takes RGBA frames; alpha is always 255
+            self._rgba = np.full((self.height, self.width, 4), 255, dtype=np.uint8)
+            self.frame_allocations += 1
+
         elif self.render == "led":
             import rgbmatrix as m
 
             # Set up the options for the matrix
             options = m.RGBMatrixOptions()
-            options.rows = 64
-            options.cols = 64
-            options.chain_length = 4
-            options.parallel = 1
+            options.cols, options.rows = panel_size
+            options.chain_length, options.pixel_mapper_config = self.get_panel_layout(panel_size, parallel)
+            options.parallel = parallel
             options.hardware_mapping = "adafruit-hat-pwm"
-            options.pixel_mapper_config = "U-mapper"
             options.gpio_slowdown = 3
             options.drop_privileges = True
             options.limit_refresh_rate_hz = 120
@@ -95,13 +169,107 @@ class Canvas:
 
             # Initialize pygame
             pygame.init()
-            self.screen = pygame.display.set_mode((640, 640))
+            # Scale the canvas up by a whole number to fit a window of about 640 pixels
+            scale = max(1, 640 // max(self.width, self.height))
+            self.screen = pygame.display.set_mode((self.width * scale, self.height * scale))
             pygame.display.set_caption("Canvas")
         
         else:
             print("Unsupported renderMode given.")
             exit(1)
 
+        # Presenting: inside draw(), or on a presenter thread fed through a queue of
+        # (buffer index, damage, hand-off time) entries
+        # SDL video calls are not thread-safe, so the window stays on this thread
+        self.present = "sync" if self.render == "pygame" else present
+        self.present_latency = 0.0
+        self.frames_presented = 0
+        self.frames_dropped = 0
+        self._queue = deque()
+        self._presenting = None
+        self._present_condition = threading.Condition()
+        if self.present != "sync":
+            self._presenter = threading.Thread(target=self._present_loop, name="canvas-presenter", daemon=True)
+            self._presenter.start()
+
+    def get_panel_layout(self, panel_size, parallel):
+        """
+        Works out how the LED panels are chained to cover the canvas.
+
+        Each of the parallel chains covers an equal band of rows. A band one
+        panel high is a straight chain; a band two panels high is a chain folded
+        back on itself with the U-mapper (four 64x64 panels make a 128x128 wall).
+
+        Parameters:
+            panel_size (tuple): The (width, height) of one panel.
+            parallel (int): The number of parallel chains.
+
+        Returns:
+            tuple: The chain length and the pixel mapper config.
+        """
+        panel_width, panel_height = panel_size
+        band_height, band_remainder = divmod(self.height, parallel)
+        panels_across, across_remainder = divmod(self.width, panel_width)
+        if band_remainder or across_remainder:
+            raise ValueError(f"A {self.width}x{self.height} canvas can't be tiled with {panel_width}x{panel_height} panels on {parallel} chains")
+
+        if band_height == panel_height:
+            return panels_across, ""
+        if band_height == 2 * panel_height:
+            return 2 * panels_across, "U-mapper"
+        raise ValueError(f"Each of the {parallel} chains would have to cover {band_height} rows of {panel_height}-row panels; use more parallel chains")
+
+    @property
+    def canvas(self):
+        """
+        The frame being drawn, a (height, width, 3) uint8 array indexed [y, x].
+
+        The array is reused from frame to frame, so keep no references to it
+        across draw() calls. Writes to it are not tracked, so the next draw()
+        presents the whole frame.
+        """
+        self._untracked = True
+        return self._back_buffer()
+
+    @canvas.setter
+    def canvas(self, frame):
+        np.copyto(self._back_buffer(), frame)
+        self.mark_dirty()
+
+    @property
+    def front(self):
+        """The frame most recently drawn, a (height, width, 3) uint8 array indexed [y, x]."""
+        return self._frames[self._front]
+
+    def _allocate_frame(self):
+        """Allocate a frame-sized buffer, counting it in frame_allocations."""
+        self.frame_allocations += 1
+        return np.zeros((self.height, self.width, 3), dtype=np.uint8)
+
+    def _back_buffer(self):
+        """
+        Return the frame being drawn.
+
+        After a swap the back frame still holds an older frame, so before it is
+        drawn on, the rectangles that changed since then are copied over from
+        the front frame. clear() and fill() repaint it entirely and skip this.
+        """
+        back = self._frames[self._back]
+        if not self._needs_sync:
+            return back
+        self._needs_sync = False
+
+        front = self._frames[self._front]
+        have = self._frame_numbers[self._back]
+        if not self._damage_history or self._damage_history[0][0] > have + 1:
+            rects = [(0, 0, self.width, self.height)]
+        else:
+            rects = [rect for number, damage in self._damage_history if number > have for rect in damage]
+
+        for x0, y0, x1, y1 in r.merge_boxes(rects, self.width, self.height):
+            back[y0:y1, x0:x1] = front[y0:y1, x0:x1]
+        return back
+
     def clear(self):
         """
         Clears the canvas by filling it with black.
@@ -112,8 +280,7 @@ class Canvas:
         Returns:
         - None
         """
-        self.canvas = np.zeros([128, 128, 3], dtype=np.uint8)
-        self.canvas[:, :] = [0, 0, 0]
+        self._repaint((0, 0, 0))
 
     def fill(self, fillcolor):
         """
@@ -125,8 +292,142 @@ class Canvas:
         Returns:
         None
         """
-        self.canvas = np.zeros([128, 128, 3], dtype=np.uint8)
-        self.canvas[:, :] = fillcolor
+        self._repaint(fillcolor)
+
+    def _repaint(self, color):
+        """Paint the frame with a background color and the layers, in place, and record the damage."""
+        frame = self._frames[self._back]
+        self._needs_sync = False
+        layers = sorted(self.layers.values(), key=lambda layer: layer.z)
+
+        # The background and the static layers under the first dynamic layer look
+        # the same every frame, so they are cached as one frame and copied in
+        base_layers = []
+        for layer in layers:
+            if not layer.static:
+                break
+            layer.render()
+            base_layers.append((layer, layer.version))
+        background = (tuple(np.broadcast_to(color, (3,)).tolist()), tuple(base_layers))
+
+        if base_layers:
+            if self._base_key != background:
+                if self._base is None:
+                    self._base = self._allocate_frame()
+                self._base[:, :] = color
+                for layer, _ in base_layers:
+                    layer.composite_into(self._base)
+                self._base_key = background
+            np.copyto(frame, self._base)
+        else:
+            frame[:, :] = color
+
+        if background == self._background:
+            # Only the pixels that items were drawn on change back
+            self._pending_damage.extend(self._content_boxes)
+        else:
+            self._pending_damage.append((0, 0, self.width, self.height))
+            self._background = background
+        self._content_boxes = []
+        self._repaints += 1
+
+        # Layers above a dynamic layer are drawn like ordinary content
+        for layer in layers[len(base_layers):]:
+            if not layer.static:
+                for item in layer.items:
+                    self.add(item)
+                continue
+
+            layer.render()
+            if layer.box is not None:
+                self._composite((layer.box[0], layer.box[1], layer.colors, layer.alpha))
+
+    def add_layer(self, name, z=None, static=True):
+        """
+        Adds a named layer that is drawn under the canvas content.
+
+        Layers are composited whenever the canvas is cleared or filled, so a
+        program can put its unchanging artwork in a static layer once and only
+        add the moving items each frame.
+
+        Parameters:
+            name (str): The name of the layer.
+            z (int, optional): The depth of the layer; higher z is drawn on top.
+                Defaults to above every existing layer.
+            static (bool, optional): Rasterize the layer once into its own buffer
+                and reuse it until it is invalidated. Defaults to True.
+
+        Returns:
+            Layer: The new layer.
+        """
+        if z is None:
+            z = max((layer.z for layer in self.layers.values()), default=-1) + 1
+        layer = Layer(self, name, z, static)
+        self.layers[name] = layer
+        return layer
+
+    def get_layer(self, name):
+        """
+        Returns the layer with the given name.
+
+        Parameters:
+            name (str): The name of the layer.
+
+        Returns:
+            Layer: The layer.
+        """
+        return self.layers[name]
+
+    def remove_layer(self, name):
+        """
+        Removes the layer with the given name.
+
+        Parameters:
+            name (str): The name of the layer.
+
+        Returns:
+            None
+        """
+        del self.layers[name]
+
+    def _damage_box(self, box):
+        """Record that an item was drawn over a (x0, y0, x1, y1) box."""
+        self._pending_damage.append(box)
+        self._content_boxes.append(box)
+
+        # Canvases that are never cleared would grow these lists forever
+        if len(self._content_boxes) > 64:
+            self._content_boxes = r.merge_boxes(self._content_boxes, self.width, self.height)
+        if len(self._pending_damage) > 64:
+            self._pending_damage = r.merge_boxes(self._pending_damage, self.width, self.height)
+
+    def mark_dirty(self, box=None):
+        """
+        Mark part of the canvas as changed outside add(), clear() and the like.
+
+        Parameters:
+        - box (tuple, optional): The (x0, y0, x1, y1) rectangle that changed, with
+          x1/y1 exclusive. Defaults to None (the whole canvas).
+
+        Returns:
+        - None
+        """
+        if box is None:
+            box = (0, 0, self.width, self.height)
+        self._damage_box(tuple(box))
+
+    def get_damage(self):
+        """
+        Returns the rectangles changed since the last draw.
+
+        Rectangles come from the bounding boxes of the items added since then and
+        of the items a clear or fill painted over (the whole canvas when the
+        background color changes).
+
+        Returns:
+            list: (x0, y0, x1, y1) rectangles with x1/y1 exclusive.
+        """
+        return r.merge_boxes(self._pending_damage, self.width, self.height)
 
     def get_points(self):
         """
@@ -135,7 +436,7 @@ class Canvas:
         Returns:
             numpy.ndarray: A 2D array of points, where each row represents a point (x, y).
         """
-        x, y = np.meshgrid(np.arange(128), np.arange(128))
+        x, y = np.meshgrid(np.arange(self.width), np.arange(self.height))
         x, y = x.flatten(), y.flatten()
         return np.vstack((x, y)).T
 
@@ -149,51 +450,290 @@ class Canvas:
         Returns:
             None
         """
+        self._composite(self._rasterize(item))
 
-        if isinstance(item, (s.ColoredBitMap, s.Image)):
-            self._blit_colored_bitmap(item)
-            return
+    def add_many(self, items):
+        """
+        Adds several items to the canvas in one call.
 
-        mask = item.contains_points(self.points).reshape(self.canvas.shape[:2])
-        self.canvas[mask] = item.color
+        Plain polygons (and lines) and filled circles are grouped and rasterized
+        in a single vectorized pass per group; everything else (including
+        anti-aliased shapes) goes through add.
+        Items are still drawn in the order given, so later items cover earlier ones.
+        With threads set, the batch is rasterized on a thread pool instead, tile by
+        tile or item by item (see split).
 
-    def _blit_colored_bitmap(self, bitmap):
-        if not bitmap.pixels:
+        Parameters:
+            items: An iterable of items to be added.
+
+        Returns:
+            None
+        """
+        items = list(items)
+        if self.threads and self.split == "items":
+            self._add_concurrent(items)
+            return
+        if self.threads:
+            self._add_tiled(items)
             return
 
-        xs = []
-        ys = []
-        colors = []
+        rasters = {}
+
+        polygons = []
+        circles = []
+        for index, item in enumerate(items):
+            render = getattr(type(item), "_rasterize_box", None)
+            if getattr(item, "antialias", False):
+                continue
+            elif render is s.Polygon._rasterize_box:
+                group = polygons
+            elif render is s.Circle._rasterize_box:
+                group = circles
+            else:
+                continue
+
+            # Off-canvas items are simply skipped
+            rasters[index] = None
+            key, origin, bbox = item._raster_params()
+            bounds = r.clip_bounds(*bbox, self.width, self.height)
+            if bounds is None:
+                continue
+
+            # Items whose cached mask is still valid need no rasterizing at all
+            cached = item._mask_cache.lookup(key, origin, bounds)
+            if cached is not None:
+                rasters[index] = cached
+                continue
+
+            box, shared = item._mask_cache.prepare(
+                key, origin, bbox, self.width, self.height, item._rasterize_box
+            )
+            if box is None:
+                rasters[index] = item._mask_cache.lookup(key, origin, bounds)
+                continue
 
-        canvas_width, canvas_height = self.canvas.shape[1], self.canvas.shape[0]
+            group.append((index, item, key, origin, bounds, box, shared))
 
-        for pixel in bitmap.pixels:
-            base_x = int(pixel.position[0])
-            base_y = int(pixel.position[1])
-            scale = max(1, int(pixel.scale))
+        if polygons:
+            masks = r.scanline_masks([entry[1].vertices for entry in polygons], [entry[5] for entry in polygons])
+            self._store_batch(polygons, masks, rasters)
 
-            for dx in range(scale):
-                x = base_x + dx
-                if x < 0 or x >= canvas_width:
+        if circles:
+            masks = r.disc_masks(
+                [entry[1].center for entry in circles],
+                [entry[1].radius_squared for entry in circles],
+                [entry[5] for entry in circles],
+            )
+            self._store_batch(circles, masks, rasters)
+
+        # Composite in submission order
+        for index, item in enumerate(items):
+            if index not in rasters:
+                self.add(item)
+            elif rasters[index] is not None:
+                x0, y0, mask = rasters[index]
+                self._composite((x0, y0, item.color, mask))
+
+    def _add_tiled(self, items):
+        """
+        Draw a batch tile by tile on the thread pool.
+
+        Tiles are bands across the whole canvas: the scanline kernels work row by
+        row, and shapes straddle fewer bands than square tiles of the same area.
+        Items are binned into the tiles their visible bounding boxes touch. Each
+        tile then rasterizes its band of every item that missed its mask cache
+        and composites its items, in order, into its own view of the frame, so
+        the result is exactly what drawing the items one by one gives. NumPy
+        releases the GIL in the heavy kernels, so the tiles run side by side.
+        Once every tile is done, the bands of each missed item are joined and
+        cached on the item, just like a mask rendered in one piece.
+
+        Parameters:
+            items (list): The items to be added.
+
+        Returns:
+            None
+        """
+        frame = self._back_buffer()
+        entries = []
+        for item in items:
+            job = getattr(item, "_raster_job", None)
+            if job is None or not hasattr(item, "_mask_cache"):
+                raster = self._rasterize(item)
+                if raster is not None:
+                    entries.append((raster, None, r.raster_box(raster)))
+                continue
+
+            job = job(self.width, self.height)
+            if job is None:
+                continue
+            key, origin, bbox, render, exclusive = job
+            bounds = r.clip_bounds(*bbox, self.width, self.height, exclusive=exclusive)
+            if bounds is None:
+                continue
+
+            # Cache hits (including shared stamps) need no rasterizing
+            cached = item._mask_cache.lookup(key, origin, bounds)
+            if cached is None:
+                box, shared = item._mask_cache.prepare(key, origin, bbox, self.width, self.height, render, exclusive)
+                if box is not None:
+                    entries.append((None, (item, key, origin, render, box, shared, {}), bounds))
                     continue
+                cached = item._mask_cache.lookup(key, origin, bounds)
 
-                for dy in range(scale):
-                    y = base_y + dy
-                    if y < 0 or y >= canvas_height:
-                        continue
+            x0, y0, mask = cached
+            entries.append(((x0, y0, item.color, mask), None, bounds))
 
-                    xs.append(x)
-                    ys.append(y)
-                    colors.append(pixel.color)
+        size = self.tile_height or -(-self.height // self.threads)
+        tiles = {}
+        for entry in entries:
+            y0, y1 = entry[2][1], entry[2][3]
+            for tile in range(y0 // size, (y1 - 1) // size + 1):
+                tiles.setdefault(tile, []).append(entry)
 
-        if not xs:
-            return
+        futures = [
+            self._get_pool().submit(
+                self._draw_tile, frame, (0, tile * size, self.width, min((tile + 1) * size, self.height)), tile_entries
+            )
+            for tile, tile_entries in tiles.items()
+        ]
+        for future in futures:
+            future.result()
+
+        for raster, job, bounds in entries:
+            if job is not None:
+                item, key, origin, render, box, shared, bands = job
+                mask = np.concatenate([bands[y] for y in sorted(bands)]) if len(bands) > 1 else bands[box[1]]
+                item._mask_cache.finish(key, origin, box, mask, shared)
+            self._damage_box(bounds)
+
+    def _add_concurrent(self, items):
+        """
+        Draw a batch with every item rasterized as its own task on the thread pool.
+
+        Each distinct item is rasterized once (through its own caches) by one
+        worker, and the masks are composited in submission order on this thread
+        as they come in, so compositing overlaps the rasterizing of later items.
 
-        xs = np.asarray(xs, dtype=np.int64)
-        ys = np.asarray(ys, dtype=np.int64)
-        colors = np.asarray(colors, dtype=np.uint8)
+        Parameters:
+            items (list): The items to be added.
+
+        Returns:
+            None
+        """
+        pool = self._get_pool()
+        rasters = {}
+        for item in items:
+            if id(item) not in rasters:
+                rasters[id(item)] = pool.submit(self._rasterize, item)
+
+        for item in items:
+            self._composite(rasters[id(item)].result())
+
+    def _get_pool(self):
+        """The thread pool used by add_many, started on first use."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="canvas-raster")
+        return self._pool
+
+    def _draw_tile(self, frame, tile, entries):
+        """Rasterize and composite a tile's share of a batch (runs on the thread pool)."""
+        for raster, job, bounds in entries:
+            if job is not None:
+                item, key, origin, render, box, shared, bands = job
+
+                # The first and last tiles of an item also render the rows of its box off the canvas
+                y0 = tile[1] if tile[1] > bounds[1] else box[1]
+                y1 = tile[3] if tile[3] < bounds[3] else box[3]
+                bands[y0] = render(box[0], y0, box[2], y1)
+                raster = (box[0], y0, item.color, bands[y0])
+            self._paint(frame, raster, tile)
+
+    def _store_batch(self, entries, masks, rasters):
+        """Cache the masks of a batch on their items and pick out the visible regions."""
+        for (index, item, key, origin, bounds, box, shared), mask in zip(entries, masks):
+            item._mask_cache.finish(key, origin, box, mask, shared)
+            rasters[index] = item._mask_cache.lookup(key, origin, bounds)
+
+    def _rasterize(self, item):
+        """
+        Work out what an item puts on the canvas, without touching the canvas.
 
-        self.canvas[ys, xs] = colors
+        Parameters:
+            item: The item to rasterize.
+
+        Returns:
+            (x0, y0, source, mask) for the canvas region starting at (x0, y0), where
+            source is the item's color or an (h, w, 3) array of colors (bitmaps) and
+            mask is a boolean mask, a uint8 coverage/alpha mask or None (every pixel
+            drawn). None if none of the item is on the canvas.
+        """
+        if isinstance(item, (s.ColoredBitMap, s.Image)):
+            return item.rasterize_colors(self.width, self.height)
+
+        # Shapes that can rasterize themselves only cover their own region
+        # of the canvas instead of testing every canvas point
+        if hasattr(item, "rasterize"):
+            raster = item.rasterize(self.width, self.height)
+            if raster is None:
+                return None
+            x0, y0, mask = raster
+            return x0, y0, item.color, mask
+
+        mask = item.contains_points(self.points).reshape(self.height, self.width)
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        if len(rows) == 0:
+            return None
+        return cols[0], rows[0], item.color, mask[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+
+    def _composite(self, raster, clip=None):
+        """
+        Composite a rasterized item into the canvas.
+
+        Boolean masks cover whole pixels and uint8 masks (anti-aliased coverage or
+        image alpha) partial ones; an RGBA color's alpha scales either.
+
+        Parameters:
+            raster: An (x0, y0, source, mask) tuple from _rasterize, or None.
+            clip (tuple, optional): Only composite inside this (x0, y0, x1, y1) box.
+
+        Returns:
+            None
+        """
+        box = self._paint(self._back_buffer(), raster, clip)
+        if box is not None:
+            self._damage_box(box)
+
+    def _paint(self, frame, raster, clip=None):
+        """Composite a rasterized item into a frame without recording damage; returns the box drawn, or None."""
+        if raster is None:
+            return None
+
+        x0, y0, source, mask = raster
+        uniform = not (isinstance(source, np.ndarray) and source.ndim == 3)
+        height, width = (mask if uniform else source).shape[:2]
+        x1, y1 = x0 + width, y0 + height
+
+        if clip is not None:
+            cx0, cy0 = max(x0, clip[0]), max(y0, clip[1])
+            cx1, cy1 = min(x1, clip[2]), min(y1, clip[3])
+            if cx0 >= cx1 or cy0 >= cy1:
+                return None
+            rows = slice(cy0 - y0, cy1 - y0)
+            cols = slice(cx0 - x0, cx1 - x0)
+            if mask is not None:
+                mask = mask[rows, cols]
+            if not uniform:
+                source = source[rows, cols]
+            x0, y0, x1, y1 = cx0, cy0, cx1, cy1
+
+        region = frame[y0:y1, x0:x1]
+        if uniform:
+            composite.paint(region, mask, source)
+        else:
+            composite.over(region, source, mask)
+        return x0, y0, x1, y1
 
     def draw(self):
 
@@ -203,57 +743,213 @@ class Canvas:
             while((time.perf_counter() - self.prev_frame_time) < frame_time):
                 time.sleep(1/self.fps/20)  # sleep for a portion of the frame time
 
-        # # # # # # ## 
-        # START - Rendering functions
-
-        # Rendering for PyGame
+        # Window events are handled here, on the program's thread
         if self.render == "pygame":
-            # Check for the close event
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     quit()
+                # The window was uncovered, so its contents have to be redrawn
+                elif event.type == pygame.VIDEOEXPOSE:
+                    self.mark_dirty()
+
+        # The rectangles that changed since the last frame
+        if self._untracked:
+            self._untracked = False
+            self.mark_dirty()
+        self.damage = self.get_damage()
+        self._pending_damage = []
+        frame = self._back_buffer()
+
+        if self.present == "sync":
+            handoff = time.perf_counter()
+            self._present(frame, self.damage)
+            self.present_latency = time.perf_counter() - handoff
+            self.frames_presented += 1
+        else:
+            with self._present_condition:
+                self._queue.append((self._back, self.damage, time.perf_counter()))
+                self._present_condition.notify_all()
+
+        # Swap: the frame just drawn becomes the front frame, and the next
+        # preallocated frame is drawn on (brought up to date lazily)
+        self._frame_numbers[self._back] = self.frame_count + 1
+        self._damage_history.append((self.frame_count + 1, self.damage))
+        if self.present == "sync":
+            next_back = (self._back + 1) % len(self._frames)
+        else:
+            next_back = self._claim_buffer()
+        self._front = self._back
+        self._back = next_back
+        self._needs_sync = True
 
-            # NEW fill method using pygame blit from a PIL image
-            # https://www.tutorialspoint.com/how-to-convert-pil-image-into-pygame-surface-image
-            frame = Image.fromarray(self.canvas)
-            resized_frame = frame.resize(
-                size=(self.screen.get_height(), self.screen.get_width()),
-                resample=Image.NEAREST,
-            )
-            pygame_surface = pygame.image.fromstring(
-                resized_frame.tobytes(), resized_frame.size, "RGB"
-            )
-            self.screen.blit(pygame_surface, (0, 0))
-            pygame.display.flip()
+        # keep track of frame timing for FPS limiter
+        self.prev_frame_time = time.perf_counter() # Track the time at which the frame was drawn
+        self.frame_count += 1
+
+    def _present(self, frame, damage):
+        """
+        Show a frame on the backend.
+
+        Parameters:
+            frame (ndarray): The (height, width, 3) frame to show.
+            damage (list): The (x0, y0, x1, y1) rectangles that changed since the last frame shown.
+
+        Returns:
+            None
+        """
+
+        # # # # # # ## 
+        # START - Rendering functions
+
+        # Rendering for PyGame
+        if self.render == "pygame":
+            scale_x, remainder_x = divmod(self.screen.get_width(), self.width)
+            scale_y, remainder_y = divmod(self.screen.get_height(), self.height)
+            if remainder_x or remainder_y or self.screen.get_bytesize() < 3:
+                # NEW fill method using pygame blit from a PIL image
+                # https://www.tutorialspoint.com/how-to-convert-pil-image-into-pygame-surface-image
+                image = Image.fromarray(frame)
+                resized_frame = image.resize(
+                    size=(self.screen.get_width(), self.screen.get_height()),
+                    resample=Image.NEAREST,
+                )
+                pygame_surface = pygame.image.fromstring(
+                    resized_frame.tobytes(), resized_frame.size, "RGB"
+                )
+                self.screen.blit(pygame_surface, (0, 0))
+                pygame.display.flip()
+            else:
+                # Write the damaged rectangles straight into the window surface,
+                # each canvas pixel repeated over a scale_x by scale_y block
+                pixels = pygame.surfarray.pixels3d(self.screen).transpose(1, 0, 2)
+                row_stride, column_stride, channel_stride = pixels.strides
+                blocks = np.lib.stride_tricks.as_strided(
+                    pixels,
+                    shape=(self.height, scale_y, self.width, scale_x, 3),
+                    strides=(row_stride * scale_y, row_stride, column_stride * scale_x, column_stride, channel_stride),
+                )
+                for x0, y0, x1, y1 in damage:
+                    blocks[y0:y1, :, x0:x1, :, :] = frame[y0:y1, None, x0:x1, None, :]
+
+                # The surface stays locked while the pixel arrays exist
+                del pixels, blocks
+                if damage:
+                    pygame.display.update([
+                        (x0 * scale_x, y0 * scale_y, (x1 - x0) * scale_x, (y1 - y0) * scale_y)
+                        for x0, y0, x1, y1 in damage
+                    ])
 
         # Rendering for direct LED Matrix
         if self.render == "led":
 
-            # convert the numpy array to a PIL image
-            frame = Image.fromarray(self.canvas)
-            self.frame_canvas.SetImage(frame)
+            # The back buffer still holds the frame before last, so it needs
+            # the damage of both the last frame and this one
+            for x0, y0, x1, y1 in r.merge_boxes(damage + self._previous_damage, self.width, self.height):
+                # convert the numpy array to a PIL image
+                self.frame_canvas.SetImage(Image.fromarray(frame[y0:y1, x0:x1]), x0, y0)
+            self._previous_damage = damage
 
             # Swap the frames between the working frames
             self.frame_canvas = self.matrix.SwapOnVSync(self.frame_canvas)
         
-        # Rendering for ZMQ
-        if self.render == "zmq":
+        # Rendering for ZMQ (the server takes whole frames, so unchanged frames are not sent)
+        if self.render == "zmq" and damage:
             
-            # convert the numpy array to a PIL image
-            frame = Image.fromarray(self.canvas)
-
-            # Convert the image to RGBA mode and rawbytestring
-            img = frame.convert("RGBA")
-            rawimage = img.tobytes()
+            # Copy the frame into the reusable RGBA buffer
+            self._rgba[:, :, :3] = frame
 
             # # send the request and receive back a "blank" response
-            # # both of these are blocking
-            self.socket.send(rawimage)
+            # # both of these are blocking, so the buffer is not reused
+            # # before it has been sent and can go without a copy
+            self.socket.send(self._rgba, copy=False)
             message = self.socket.recv()
 
         # END - Rendering functions
         # # # # # # ## 
 
-        # keep track of frame timing for FPS limiter
-        self.prev_frame_time = time.perf_counter() # Track the time at which the frame was drawn
-        self.frame_count += 1
+    def _present_loop(self):
+        """Present queued frames in order (runs on the presenter thread)."""
+        while True:
+            with self._present_condition:
+                while not self._queue:
+                    self._present_condition.wait()
+                entry = self._queue.popleft()
+                if entry is None:
+                    # close() was called
+                    return
+                index, damage, handoff = entry
+                self._presenting = index
+
+            self._present(self._frames[index], damage)
+
+            with self._present_condition:
+                self._presenting = None
+                self.present_latency = time.perf_counter() - handoff
+                self.frames_presented += 1
+                self._present_condition.notify_all()
+
+    def _claim_buffer(self):
+        """
+        Pick a buffer the presenter is not holding to draw the next frame in.
+
+        When every buffer is queued or being presented, present="block" waits for
+        one, and present="drop" drops the oldest queued frame and takes its
+        buffer; its damage moves to the next queued frame so nothing is lost.
+
+        Returns:
+            int: The index of the buffer.
+        """
+        count = len(self._frames)
+        with self._present_condition:
+            while True:
+                held = {entry[0] for entry in self._queue}
+                held.add(self._presenting)
+                for offset in range(1, count + 1):
+                    index = (self._back + offset) % count
+                    if index not in held:
+                        return index
+
+                if self.present == "drop" and len(self._queue) > 1:
+                    index, damage, _ = self._queue.popleft()
+                    later_index, later_damage, later_handoff = self._queue[0]
+                    merged = r.merge_boxes(damage + later_damage, self.width, self.height)
+                    self._queue[0] = (later_index, merged, later_handoff)
+                    self.frames_dropped += 1
+                    return index
+
+                self._present_condition.wait()
+
+    def wait_presented(self):
+        """
+        Blocks until every frame handed to the presenter thread has been shown.
+
+        Returns:
+            None
+        """
+        with self._present_condition:
+            while self._queue or self._presenting is not None:
+                self._present_condition.wait()
+
+    def close(self):
+        """
+        Presents the outstanding frames and stops the presenter thread and the add_many() thread pool.
+
+        Returns:
+            None
+        """
+        if self.present != "sync" and self._presenter.is_alive():
+            self.wait_presented()
+            with self._present_condition:
+                self._queue.append(None)
+                self._present_condition.notify_all()
+            self._presenter.join()
+
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
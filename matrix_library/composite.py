@@ -0,0 +1,124 @@
+import numpy as np
+
+
+def split_color(color) -> tuple:
+    """
+    Split an RGB or RGBA color into its RGB part and its alpha.
+
+    Parameters:
+    - color: An (r, g, b) or (r, g, b, a) color.
+
+    Returns:
+    - (rgb, alpha) where rgb is an (r, g, b) tuple and alpha is 0 to 255
+      (255 when the color has no alpha).
+    """
+    if len(color) > 3:
+        return tuple(color[:3]), int(color[3])
+    return tuple(color), 255
+
+
+def over(region: np.ndarray, source, mask: np.ndarray = None) -> None:
+    """
+    Source-over composite into an opaque region of the canvas, in place.
+
+    Opaque pixels are copied and transparent pixels are skipped; only the
+    pixels in between go through the blend, which is done in uint16 integer
+    math as (region * (255 - a) + source * a + 127) // 255.
+
+    Parameters:
+    - region (np.ndarray): An (h, w, 3) uint8 view of the canvas.
+    - source: An RGB color, or an (h, w, 3) uint8 array of colors.
+    - mask (np.ndarray, optional): None (every pixel opaque), an (h, w) boolean
+      array (set pixels opaque, the rest transparent) or an (h, w) uint8 alpha
+      array. Defaults to None.
+    """
+    uniform = np.ndim(source) == 1
+    if mask is None:
+        region[...] = source
+        return
+
+    if mask.dtype == bool:
+        region[mask] = source if uniform else source[mask]
+        return
+
+    # Whole region fully transparent or fully opaque: no per-pixel work at all
+    lowest = mask.min()
+    highest = mask.max()
+    if highest == 0:
+        return
+    if lowest == 255:
+        region[...] = source
+        return
+
+    opaque = mask == 255
+    if highest == 255:
+        region[opaque] = source if uniform else source[opaque]
+
+    partial = (mask != 0) & ~opaque
+    _blend(region, partial, source if uniform else source[partial], mask[partial])
+
+
+def paint(region: np.ndarray, mask: np.ndarray, color) -> None:
+    """
+    Composite one color into a region of the canvas through a coverage mask.
+
+    Parameters:
+    - region (np.ndarray): An (h, w, 3) uint8 view of the canvas.
+    - mask (np.ndarray): An (h, w) boolean mask or uint8 coverage mask.
+    - color: An RGB or RGBA color.
+    """
+    rgb, alpha = split_color(color)
+    if alpha == 255:
+        over(region, rgb, mask)
+    elif alpha == 0:
+        return
+    elif mask.dtype == bool:
+        _blend(region, mask, rgb, alpha)
+    else:
+        over(region, rgb, ((mask.astype(np.uint16) * alpha + 127) // 255).astype(np.uint8))
+
+
+def _blend(region: np.ndarray, where: np.ndarray, source, alpha) -> None:
+    """Blend source into the selected pixels of region with an alpha (a scalar or one per pixel)."""
+    alpha = np.asarray(alpha, dtype=np.uint16)
+    if alpha.ndim:
+        alpha = alpha[:, None]
+    source = np.asarray(source, dtype=np.uint16)
+    blended = region[where] * (255 - alpha) + source * alpha
+    region[where] = (blended + 127) // 255
+
+
+def over_transparent(colors: np.ndarray, alpha: np.ndarray, source, mask: np.ndarray = None) -> None:
+    """
+    Source-over composite into a region that has its own alpha (a layer buffer), in place.
+
+    Parameters:
+    - colors (np.ndarray): An (h, w, 3) uint8 view of the buffer's colors (not premultiplied).
+    - alpha (np.ndarray): An (h, w) uint8 view of the buffer's alpha.
+    - source: An RGB or RGBA color, or an (h, w, 3) uint8 array of colors.
+    - mask (np.ndarray, optional): None, an (h, w) boolean mask or an (h, w) uint8
+      coverage/alpha mask, as for over. Defaults to None.
+    """
+    if np.ndim(source) == 1:
+        rgb, color_alpha = split_color(source)
+        source = np.asarray(rgb, dtype=np.uint32)
+    else:
+        source = source.astype(np.uint32)
+        color_alpha = 255
+
+    if mask is None:
+        source_alpha = np.full(alpha.shape, color_alpha, dtype=np.uint32)
+    elif mask.dtype == bool:
+        source_alpha = mask.astype(np.uint32) * color_alpha
+    else:
+        source_alpha = (mask.astype(np.uint32) * color_alpha + 127) // 255
+
+    # Everything below is scaled by 255: what shows through of the old buffer,
+    # and the alpha of the result
+    through = alpha.astype(np.uint32) * (255 - source_alpha)
+    total = source_alpha * 255 + through
+
+    drawn = source_alpha > 0
+    weighted = source * (source_alpha * 255)[:, :, None] + colors.astype(np.uint32) * through[:, :, None]
+    colors[drawn] = (weighted[drawn] + total[drawn][:, None] // 2) // total[drawn][:, None]
+    alpha[...] = (total + 127) // 255
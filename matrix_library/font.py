@@ -0,0 +1,62 @@
+from matrix_library import utils
+import numpy as np
+
+
+class GlyphAtlas:
+    def __init__(self, char_mask: dict):
+        """
+        Compiles an 8x8 font into one contiguous NumPy glyph atlas.
+
+        Parameters:
+        - char_mask (dict): Maps each character to a list of 64 booleans (row major).
+
+        Attributes:
+        - glyphs (ndarray): A (n_glyphs, 8, 8) boolean array. Index 0 is a blank glyph
+          and the last index is the checkered pattern used for unknown characters.
+        - index (dict): Maps each character to its index in glyphs.
+        - blank (int): The index of the blank glyph.
+        - unknown (int): The index of the glyph used for unknown characters.
+        """
+        chars = list(char_mask)
+        checkered = [((i + j) % 2 == 1) for i in range(8) for j in range(8)]
+        masks = [[False] * 64] + [char_mask[char] for char in chars] + [checkered]
+
+        self.glyphs = np.ascontiguousarray(np.array(masks, dtype=bool).reshape(len(masks), 8, 8))
+        self.glyphs.flags.writeable = False
+        self.index = {char: i + 1 for i, char in enumerate(chars)}
+        self.blank = 0
+        self.unknown = len(masks) - 1
+
+        # Upscaled copies of the atlas, one per integer size
+        self._scaled = {1: self.glyphs}
+
+    def lookup(self, char: str) -> int:
+        """Return the atlas index of a character (the unknown glyph if it is not in the font)."""
+        if char == "":
+            return self.blank
+        return self.index.get(char, self.unknown)
+
+    def lookup_text(self, text: str) -> np.ndarray:
+        """Return the atlas indices of every character in text."""
+        return np.fromiter((self.lookup(char) for char in text), dtype=np.intp, count=len(text))
+
+    def scaled(self, size: int) -> np.ndarray:
+        """
+        Return the atlas upscaled by an integer size, building it on first use.
+
+        Parameters:
+        - size (int): The scale factor of every glyph pixel.
+
+        Returns:
+        - glyphs (ndarray): A read-only (n_glyphs, 8 * size, 8 * size) boolean array.
+        """
+        glyphs = self._scaled.get(size)
+        if glyphs is None:
+            glyphs = self.glyphs.repeat(size, axis=1).repeat(size, axis=2)
+            glyphs.flags.writeable = False
+            self._scaled[size] = glyphs
+        return glyphs
+
+
+# The font used by Letter and Phrase, compiled once at import
+atlas = GlyphAtlas(utils.char_mask)
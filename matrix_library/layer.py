@@ -0,0 +1,118 @@
+import numpy as np
+from matrix_library import composite, raster
+
+
+class Layer:
+    def __init__(self, canvas, name: str, z: int = 0, static: bool = True):
+        """
+        A named group of items drawn under the canvas's own (dynamic) content.
+
+        Layers are composited, in z-order, whenever the canvas is cleared or
+        filled, so each frame only has to add what actually moves. A static
+        layer is rasterized once into its own buffer and kept until it is
+        invalidated (adding or removing items invalidates it; changing an item
+        in place needs invalidate()). A layer that is not static draws its
+        items again every time it is composited.
+
+        Parameters:
+        - canvas (Canvas): The canvas the layer belongs to.
+        - name (str): The name of the layer.
+        - z (int, optional): The depth of the layer; higher z is drawn on top. Defaults to 0.
+        - static (bool, optional): Cache the layer in its own buffer. Defaults to True.
+
+        Attributes:
+        - items (list): The items in the layer, in drawing order.
+        - version (int): Bumped every time the buffer is rendered again.
+        """
+        self.canvas = canvas
+        self.name = name
+        self.z = z
+        self.static = static
+        self.items = []
+        self.version = 0
+
+        # The rendered buffer, cropped to the drawn pixels: colors, alpha and the box they cover
+        self.colors = None
+        self.alpha = None
+        self.box = None
+        self._valid = False
+
+    def add(self, item):
+        """
+        Adds an item to the layer.
+
+        Parameters:
+        - item: The item to be added.
+
+        Returns:
+        - item: The item, so it can be created and added in one line.
+        """
+        self.items.append(item)
+        self.invalidate()
+        return item
+
+    def remove(self, item) -> None:
+        """Removes an item from the layer."""
+        self.items.remove(item)
+        self.invalidate()
+
+    def clear(self) -> None:
+        """Removes every item from the layer."""
+        self.items = []
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Re-rasterizes the layer the next time it is composited."""
+        self._valid = False
+
+    def render(self) -> None:
+        """Rasterizes the layer's items into its buffer, if it is out of date."""
+        if self._valid:
+            return
+
+        width, height = self.canvas.width, self.canvas.height
+        colors = np.zeros((height, width, 3), dtype=np.uint8)
+        alpha = np.zeros((height, width), dtype=np.uint8)
+
+        boxes = []
+        for item in self.items:
+            item_raster = self.canvas._rasterize(item)
+            if item_raster is None:
+                continue
+
+            x0, y0, source, mask = item_raster
+            item_height, item_width = (mask if mask is not None else source).shape[:2]
+            x1, y1 = x0 + item_width, y0 + item_height
+            composite.over_transparent(colors[y0:y1, x0:x1], alpha[y0:y1, x0:x1], source, mask)
+            boxes.append((x0, y0, x1, y1))
+
+        self.colors = self.alpha = self.box = None
+        if boxes:
+            x0, y0, x1, y1 = self.box = raster.union_bounds(boxes)
+            self.colors = colors[y0:y1, x0:x1].copy()
+            alpha = alpha[y0:y1, x0:x1]
+
+            # Opaque layers are plain copies; layers without partial alpha are masked copies
+            if (alpha == 255).all():
+                self.alpha = None
+            elif ((alpha == 0) | (alpha == 255)).all():
+                self.alpha = alpha == 255
+            else:
+                self.alpha = alpha.copy()
+
+        self.version += 1
+        self._valid = True
+
+    def composite_into(self, target: np.ndarray) -> None:
+        """
+        Composites the layer's buffer into an (height, width, 3) frame.
+
+        Parameters:
+        - target (np.ndarray): The frame to draw on, in place.
+        """
+        self.render()
+        if self.box is None:
+            return
+
+        x0, y0, x1, y1 = self.box
+        composite.over(target[y0:y1, x0:x1], self.colors, self.alpha)
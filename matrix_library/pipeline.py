@@ -0,0 +1,262 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+import pickle
+
+
+class RenderPipeline:
+    def __init__(self, backgroundcolor=(0, 0, 0), width: int = 128, height: int = 128, slots: int = 3, **canvas_options):
+        """
+        Rasterizes and presents frames in a separate render process.
+
+        The program builds a display list (the items of a frame, in drawing
+        order) and submits it; the render process owns a Canvas and its backend,
+        draws the list and presents it while the program already works on the
+        next frame, so game logic and rendering run on different cores instead
+        of sharing one GIL.
+
+        Display lists are sent through a pipe, and items stay resident in the
+        render process: an item is pickled whole (without its cached masks) in
+        the first frame it appears in, and after that only the attributes that
+        changed since the previous frame are pickled and sent. Shapes record
+        their own attribute assignments; after editing an attribute in place
+        (an array or list), call item.mark_changed(name). The render process keeps
+        drawing the same objects, so the caches built on them (masks, text
+        layouts, scaled bitmaps) are reused. Rendered frames come back through a ring of `slots` frames
+        in shared memory: they are never pickled, and latest() reads the newest
+        one straight out of the ring. At most `slots` frames are in flight, so a
+        program that runs ahead of the display waits in submit().
+
+        The render process is forked where possible; on platforms without fork,
+        the program's main module must be guarded with `if __name__ == "__main__":`.
+
+        Parameters:
+        - backgroundcolor (tuple, optional): The color behind every frame. Defaults to (0, 0, 0).
+        - width (int, optional): The width of the canvas. Defaults to 128.
+        - height (int, optional): The height of the canvas. Defaults to 128.
+        - slots (int, optional): The number of frames in the ring. Defaults to 3.
+        - canvas_options: Passed on to the Canvas in the render process (renderMode, fps, limitFps, ...).
+
+        Attributes:
+        - frame_count (int): The number of frames submitted.
+        - dropped (int): The number of frames submit() dropped because the ring was full.
+        """
+        self.color = backgroundcolor
+        self.width = width
+        self.height = height
+        self.slots = slots
+        self.frame_count = 0
+        self.dropped = 0
+
+        # The items resident in the render process by id, with the pickled attributes last sent
+        self._resident = {}
+
+        # The ring: one frame number per slot and the newest frame number, then the frames
+        header = 8 * (slots + 1)
+        self._memory = shared_memory.SharedMemory(create=True, size=header + slots * height * width * 3)
+        self._numbers = np.ndarray((slots + 1,), dtype=np.int64, buffer=self._memory.buf)
+        self._numbers[:] = 0
+        self._frames = np.ndarray((slots, height, width, 3), dtype=np.uint8, buffer=self._memory.buf, offset=header)
+
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        else:
+            context = multiprocessing.get_context()
+        self._free = context.Semaphore(slots)
+        receiver, self._sender = context.Pipe(duplex=False)
+        self._process = context.Process(
+            target=_render_loop,
+            args=(self._memory, receiver, self._sender, self._free, backgroundcolor, width, height, slots, canvas_options),
+            name="matrix-render",
+            daemon=True,
+        )
+        self._process.start()
+        receiver.close()
+
+    @property
+    def presented(self) -> int:
+        """The number of the newest frame the render process has presented."""
+        return int(self._numbers[-1])
+
+    def submit(self, items, background=None, block: bool = True) -> bool:
+        """
+        Hands a frame to the render process.
+
+        Parameters:
+        - items: An iterable of items, drawn in order like Canvas.add_many.
+        - background (tuple, optional): The color behind the items. Defaults to None (backgroundcolor).
+        - block (bool, optional): Wait for a free slot when the ring is full; otherwise
+          drop the frame. Defaults to True.
+
+        Returns:
+        - bool: Whether the frame was submitted.
+        """
+        while not self._free.acquire(timeout=0.5 if block else 0):
+            if not block:
+                self.dropped += 1
+                return False
+            if not self._process.is_alive():
+                # The window was closed, which ends the program like Canvas.draw does
+                quit()
+
+        self.frame_count += 1
+        self._sender.send((self.frame_count, background if background is not None else self.color, self._display_list(items)))
+        return True
+
+    def _display_list(self, items) -> list:
+        """
+        Builds the entries of a frame: (key, item, None) for an item the render
+        process does not have yet, (key, None, changes) for a resident one.
+
+        Items that track their changes (see shapes.Tracked) send the attributes
+        assigned since the previous frame without any other work; other items
+        are pickled attribute by attribute and compared with what was sent before.
+        Items that leave the display list are dropped from the render process too.
+        """
+        entries = []
+        resident = {}
+        for item in items:
+            key = id(item)
+            previous = resident.get(key) or self._resident.get(key)
+            changed_since = getattr(item, "changed_since", None)
+            if previous is None or previous[0] is not item:
+                if changed_since is not None:
+                    sent = changed_since()[1]
+                else:
+                    sent = {name: pickle.dumps(value, pickle.HIGHEST_PROTOCOL) for name, value in _item_state(item).items()}
+                entries.append((key, item, None))
+            elif changed_since is not None:
+                names, sent = changed_since(previous[1])
+                changes = {}
+                if names:
+                    state = _item_state(item)
+                    changes = {name: state[name] for name in names if name in state}
+                entries.append((key, None, changes))
+            else:
+                sent = previous[1]
+                changes = {}
+                for name, value in _item_state(item).items():
+                    data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+                    if sent.get(name) != data:
+                        sent[name] = data
+                        changes[name] = value
+                entries.append((key, None, changes))
+
+            # Holding the item keeps its id from being reused while it is resident
+            resident[key] = (item, sent)
+
+        self._resident = resident
+        return entries
+
+    def latest(self):
+        """
+        Reads the newest rendered frame out of the ring.
+
+        Returns:
+        - (number, frame) with a copy of the (height, width, 3) frame, or None before the first frame.
+        """
+        while True:
+            number = int(self._numbers[-1])
+            if number == 0:
+                return None
+
+            slot = number % self.slots
+            frame = self._frames[slot].copy()
+
+            # The slot was not reused while it was being copied
+            if self._numbers[slot] == number:
+                return number, frame
+
+    def wait(self) -> None:
+        """Blocks until every submitted frame has been presented."""
+        for _ in range(self.slots):
+            self._free.acquire()
+        for _ in range(self.slots):
+            self._free.release()
+
+    def close(self) -> None:
+        """Presents the outstanding frames, stops the render process and frees the ring."""
+        if self._process.is_alive():
+            self._sender.send(None)
+            self._process.join()
+        self._sender.close()
+
+        self._resident = {}
+        self._numbers = self._frames = None
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _render_loop(memory, display_lists, sender, free, backgroundcolor, width, height, slots, canvas_options):
+    """Draws and presents display lists until close() or the program exits (runs in the render process)."""
+    from matrix_library.canvas import Canvas
+
+    # Only the program may hold the send end, or recv() would never see it close
+    sender.close()
+
+    canvas = Canvas(backgroundcolor, width=width, height=height, **canvas_options)
+    header = 8 * (slots + 1)
+    numbers = np.ndarray((slots + 1,), dtype=np.int64, buffer=memory.buf)
+    frames = np.ndarray((slots, height, width, 3), dtype=np.uint8, buffer=memory.buf, offset=header)
+
+    # The items of the previous frame, by their id in the program
+    retained = {}
+    while True:
+        try:
+            message = display_lists.recv()
+        except EOFError:
+            # The program exited without calling close()
+            break
+        if message is None:
+            break
+
+        number, background, entries = message
+        items = []
+        current = {}
+        for key, item, changes in entries:
+            if item is None:
+                item = current.get(key) or retained[key]
+                if changes:
+                    _apply_changes(item, changes)
+            current[key] = item
+            items.append(item)
+        retained = current
+
+        canvas.fill(background)
+        canvas.add_many(items)
+        canvas.draw()
+
+        # Publish the frame: mark the slot as being written, copy, then number it
+        slot = number % slots
+        numbers[slot] = -1
+        frames[slot] = canvas.front
+        numbers[slot] = number
+        numbers[-1] = number
+        free.release()
+
+    del numbers, frames
+    memory.close()
+
+
+def _item_state(item) -> dict:
+    """The attributes of an item as it would be pickled."""
+    getstate = getattr(item, "__getstate__", None)
+    state = getstate() if getstate is not None else None
+    return state if isinstance(state, dict) else item.__dict__
+
+
+def _apply_changes(item, changes: dict) -> None:
+    """Updates a resident item with the attributes that changed (runs in the render process)."""
+    for name, value in changes.items():
+        setattr(item, name, value)
+
+    # Caches the item leaves out of its pickled state may be stale now, so drop them like a fresh copy would
+    for name, value in _item_state(item).items():
+        if item.__dict__.get(name) is not value:
+            item.__dict__[name] = value
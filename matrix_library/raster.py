@@ -0,0 +1,1003 @@
+import math
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+# Geometry closer than this is treated as identical by the mask caches
+KEY_TOLERANCE = 1e-9
+KEY_DECIMALS = 9
+
+# Cached masks reach this many pixels past the canvas, so shapes moving off and on keep hitting them
+MASK_PAD = 16
+
+# Polygons with at least this many vertices test points against their triangulation
+TRIANGULATE_MIN_VERTICES = 96
+
+# Points are binned into at most this many cells along each axis to find the points of a triangle
+POINT_CELLS = 32
+
+
+def clip_bounds(x_min, y_min, x_max, y_max, width: int, height: int, exclusive: bool = False, pad: int = 0):
+    """
+    Clip a bounding box to the pixel grid of a canvas.
+
+    Only plain Python math is used so off-canvas shapes are rejected before
+    any NumPy work is done.
+
+    Parameters:
+    - x_min, y_min, x_max, y_max: The bounding box of the shape.
+    - width (int): The width of the pixel grid.
+    - height (int): The height of the pixel grid.
+    - exclusive (bool, optional): Treat x_max/y_max as exclusive (bitmaps) rather
+      than inclusive (geometry). Defaults to False.
+    - pad (int, optional): Grow the grid by this many pixels on every side. Defaults to 0.
+
+    Returns:
+    - (x0, y0, x1, y1) integer pixel bounds with x1/y1 exclusive, or None if
+      no pixel of the grid falls inside the box.
+    """
+    x0 = max(-pad, math.ceil(x_min))
+    y0 = max(-pad, math.ceil(y_min))
+    if exclusive:
+        x1 = min(width + pad, math.ceil(x_max))
+        y1 = min(height + pad, math.ceil(y_max))
+    else:
+        x1 = min(width + pad, math.floor(x_max) + 1)
+        y1 = min(height + pad, math.floor(y_max) + 1)
+
+    if x0 >= x1 or y0 >= y1:
+        return None
+
+    return x0, y0, x1, y1
+
+
+def raster_box(item_raster) -> tuple:
+    """Return the (x0, y0, x1, y1) canvas box covered by an (x0, y0, source, mask) raster."""
+    x0, y0, source, mask = item_raster
+    height, width = (mask if mask is not None else source).shape[:2]
+    return x0, y0, x0 + width, y0 + height
+
+
+def union_bounds(boxes: list):
+    """Return the smallest (x0, y0, x1, y1) box containing every box in a non-empty list."""
+    return (
+        min(box[0] for box in boxes), min(box[1] for box in boxes),
+        max(box[2] for box in boxes), max(box[3] for box in boxes),
+    )
+
+
+def merge_boxes(boxes: list, width: int, height: int, limit: int = 16) -> list:
+    """
+    Reduce a list of damaged pixel boxes to a few boxes that cover them.
+
+    Boxes are clipped to the grid, empty boxes and boxes inside other boxes are
+    dropped, and if more than limit remain they are replaced by their union.
+
+    Parameters:
+    - boxes (list): (x0, y0, x1, y1) boxes with x1/y1 exclusive.
+    - width (int): The width of the pixel grid.
+    - height (int): The height of the pixel grid.
+    - limit (int, optional): The most boxes to return. Defaults to 16.
+
+    Returns:
+    - boxes (list): Sorted (x0, y0, x1, y1) boxes, clipped to the grid.
+    """
+    clipped = set()
+    for x0, y0, x1, y1 in boxes:
+        box = (max(0, int(x0)), max(0, int(y0)), min(width, int(x1)), min(height, int(y1)))
+        if box[0] < box[2] and box[1] < box[3]:
+            clipped.add(box)
+
+    # Too many boxes to compare pairwise: one box covers them all
+    if len(clipped) > 4 * limit:
+        return [union_bounds(list(clipped))]
+
+    merged = [
+        box for box in clipped
+        if not any(
+            other != box and other[0] <= box[0] and other[1] <= box[1] and other[2] >= box[2] and other[3] >= box[3]
+            for other in clipped
+        )
+    ]
+    if len(merged) > limit:
+        return [union_bounds(merged)]
+    return sorted(merged)
+
+
+def scanline_mask(vertices, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+    """
+    Fill a polygon with the even-odd rule using a scanline edge table.
+
+    Every pixel row of the box is intersected with all non-horizontal edges
+    at once, the crossings are sorted and paired into spans, and the spans
+    are expanded into a mask with a running sum. The crossing test matches
+    Polygon.contains_points exactly, so both paths agree pixel for pixel.
+
+    Parameters:
+    - vertices: An (N, 2) array of polygon vertices.
+    - x0, y0, x1, y1 (int): The pixel box to fill (x1/y1 exclusive).
+
+    Returns:
+    - mask (np.ndarray): A (y1 - y0, x1 - x0) boolean array.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    width = x1 - x0
+    height = y1 - y0
+
+    # Edge i runs from vertex i-1 to vertex i, like the ray casting loop
+    xi = vertices[:, 0]
+    yi = vertices[:, 1]
+    xj = np.roll(xi, 1)
+    yj = np.roll(yi, 1)
+
+    # Horizontal edges never cross a scanline
+    keep = yi != yj
+    xi, yi, xj, yj = xi[keep], yi[keep], xj[keep], yj[keep]
+    if len(xi) == 0:
+        return np.zeros((height, width), dtype=bool)
+
+    # Active edge table: crossings of every scanline with every edge
+    rows = np.arange(y0, y1)[:, None]
+    crosses = (yi > rows) != (yj > rows)
+    x_cross = (xj - xi) * (rows - yi) / (yj - yi + 1e-12) + xi
+    x_cross = np.where(crosses, x_cross, np.inf)
+    if x_cross.shape[1] % 2:
+        x_cross = np.hstack((x_cross, np.full((height, 1), np.inf)))
+    x_cross.sort(axis=1)
+
+    # A pixel x is inside while x >= crossing 2k and x < crossing 2k+1
+    spans = np.clip(np.ceil(x_cross), x0, x1).astype(np.int64) - x0
+    return spans_to_mask(spans[:, 0::2], spans[:, 1::2], width)
+
+
+def _cross(u: np.ndarray, w: np.ndarray) -> np.ndarray:
+    """The z component of the cross product of 2-D vectors along the last axis."""
+    return u[..., 0] * w[..., 1] - u[..., 1] * w[..., 0]
+
+
+def _ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenate arange(start, start + count) for every start and count."""
+    ends = np.cumsum(counts)
+    return np.repeat(starts - ends + counts, counts) + np.arange(ends[-1] if len(ends) else 0)
+
+
+def triangulate(vertices):
+    """
+    Ear clipping triangulation of a simple polygon.
+
+    Ears are clipped in rounds: every round clips all the ears that are not
+    next to each other at once, so convex and regular polygons end up with
+    small triangles along the boundary and a few big ones inside instead of a
+    fan of long slivers (the rasterizers work over each triangle's bounding
+    box). Collinear vertices are clipped as zero-area triangles.
+
+    Parameters:
+    - vertices: An (N, 2) array of polygon vertices, in either winding order.
+
+    Returns:
+    - triangles (np.ndarray): An (N - 2, 3) array of vertex indices, or None if the
+      polygon has no area or no ear can be found (it intersects itself).
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    if len(vertices) < 3:
+        return None
+
+    x = vertices[:, 0]
+    y = vertices[:, 1]
+    area = np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)
+    if area == 0:
+        return None
+    winding = 1.0 if area > 0 else -1.0
+
+    remaining = np.arange(len(vertices))
+    triangles = []
+    while len(remaining) > 3:
+        count = len(remaining)
+        corner = vertices[remaining]
+        before = np.roll(corner, 1, axis=0)
+        after = np.roll(corner, -1, axis=0)
+        turn = _cross(corner - before, after - corner) * winding
+
+        # A convex vertex is an ear unless a reflex (or collinear) vertex lies in its triangle
+        ears = turn == 0
+        convex = np.flatnonzero(turn > 0)
+        blocking = corner[turn <= 0][None]
+        if len(convex) and blocking.shape[1]:
+            a = before[convex][:, None]
+            b = corner[convex][:, None]
+            c = after[convex][:, None]
+            inside = (
+                (_cross(b - a, blocking - a) * winding >= 0)
+                & (_cross(c - b, blocking - b) * winding >= 0)
+                & (_cross(a - c, blocking - c) * winding >= 0)
+            )
+            inside &= ~((blocking == a).all(axis=2) | (blocking == b).all(axis=2) | (blocking == c).all(axis=2))
+            ears[convex] = ~inside.any(axis=1)
+        else:
+            ears[convex] = True
+
+        # Clip the ears that are not next to each other, keeping a triangle for the end
+        chosen = []
+        for i in np.flatnonzero(ears):
+            if chosen and (chosen[-1] == i - 1 or (i == count - 1 and chosen[0] == 0)):
+                continue
+            chosen.append(i)
+        chosen = np.array(chosen[:count - 3], dtype=np.int64)
+        if len(chosen) == 0:
+            return None
+
+        triangles.append(np.column_stack((remaining[chosen - 1], remaining[chosen], remaining[(chosen + 1) % count])))
+        remaining = np.delete(remaining, chosen)
+
+    triangles.append(remaining[None])
+    return np.vstack(triangles)
+
+
+def triangle_edges(triangles: np.ndarray, count: int) -> np.ndarray:
+    """
+    The edges of every triangle, oriented for the even-odd crossing test.
+
+    Polygon edges keep the direction the ray casting loop of
+    Polygon.contains_points gives them (from vertex i-1 to vertex i), and a
+    diagonal always points the same way in both triangles that share it. The
+    crossings of a diagonal then cancel out, so XOR-ing the triangles gives
+    exactly the even-odd fill of the polygon, boundary pixels included. This
+    holds for any triangulation from clipping vertices; the shape of the
+    triangles only decides how much work the rasterizers do.
+
+    Parameters:
+    - triangles (np.ndarray): A (T, 3) array of vertex indices from triangulate.
+    - count (int): The number of vertices of the polygon.
+
+    Returns:
+    - edges (np.ndarray): A (T, 3, 2) array of (i, j) vertex indices, one edge from j to i per side.
+    """
+    a = triangles
+    b = np.roll(triangles, -1, axis=1)
+    forward = (b - a) % count == 1
+    backward = (a - b) % count == 1
+    i = np.where(forward, b, np.where(backward, a, np.maximum(a, b)))
+    j = np.where(forward, a, np.where(backward, b, np.minimum(a, b)))
+    return np.stack((i, j), axis=2)
+
+
+def triangle_coverage(vertices, triangles: np.ndarray) -> float:
+    """
+    The area covered by a triangulation over the area of the polygon.
+
+    It is 1 for a triangulation that tiles the polygon, more when triangles
+    overlap (polygons that touch or cross themselves), and it does not change
+    when the vertices are rotated, translated or scaled.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    x = vertices[:, 0]
+    y = vertices[:, 1]
+    area = abs(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+    corners = vertices[triangles]
+    covered = np.abs(_cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])).sum()
+    return covered / area if area else math.inf
+
+
+def edge_coefficients(vertices, edges: np.ndarray) -> np.ndarray:
+    """
+    The ray casting coefficients of every side of every triangle.
+
+    They only change when the vertices move, so shapes that test or fill the
+    same triangulation again can pass the table back in.
+
+    Parameters:
+    - vertices: An (N, 2) array of polygon vertices.
+    - edges (np.ndarray): The (T, 3, 2) oriented edges from triangle_edges.
+
+    Returns:
+    - sides (np.ndarray): A (T, 3, 5) table of xi, yi, yj, xj - xi and yj - yi + 1e-12.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    xi, yi = np.moveaxis(vertices[edges[:, :, 0]], 2, 0)
+    xj, yj = np.moveaxis(vertices[edges[:, :, 1]], 2, 0)
+    return np.stack((xi, yi, yj, xj - xi, yj - yi + 1e-12), axis=2)
+
+
+def _crossings(sides: np.ndarray, x, y) -> np.ndarray:
+    """
+    The ray casting test of Polygon.contains_points: whether a ray from (x, y)
+    to the right crosses each side (rows of the coefficient table), with the
+    same float operations so the results match bit for bit.
+    """
+    xi, yi, yj, dx, dy = np.moveaxis(sides, -1, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return ((yi > y) != (yj > y)) & (x < dx * (y - yi) / dy + xi)
+
+
+def _triangle_bounds(vertices: np.ndarray, edges: np.ndarray):
+    """The (x_min, y_min, x_max, y_max) arrays of every triangle's bounding box."""
+    corners = vertices[edges.reshape(len(edges), -1)]
+    low = corners.min(axis=1)
+    high = corners.max(axis=1)
+    return low[:, 0], low[:, 1], high[:, 0], high[:, 1]
+
+
+def points_in_triangles(vertices, edges: np.ndarray, points: np.ndarray, sides: np.ndarray = None) -> np.ndarray:
+    """
+    Even-odd point test against a triangulated polygon.
+
+    Points are binned into a coarse grid once, every triangle picks the points
+    in the cells under its bounding box and tests them against its three
+    edges (half-space tests with the ray casting formula), and the parities
+    are summed per point. Points outside a triangle always have an even
+    parity, so the work grows with the area the triangles cover instead of
+    points times edges, and the result is identical to ray casting against
+    the polygon.
+
+    Parameters:
+    - vertices: An (N, 2) array of polygon vertices.
+    - edges (np.ndarray): The (T, 3, 2) oriented edges from triangle_edges.
+    - points (np.ndarray): An (M, 2) array of (x, y) points.
+    - sides (np.ndarray, optional): The table from edge_coefficients. Defaults to None (built here).
+
+    Returns:
+    - inside (np.ndarray): A boolean array, True for points inside the polygon.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    points = np.asarray(points, dtype=float)
+    result = np.zeros(len(points), dtype=bool)
+    if len(points) == 0:
+        return result
+    if sides is None:
+        sides = edge_coefficients(vertices, edges)
+    x_min, y_min, x_max, y_max = _triangle_bounds(vertices, edges)
+
+    # Bin the points into a coarse grid of cells, row by row
+    low = points.min(axis=0)
+    cells = max(1, min(POINT_CELLS, int(math.sqrt(len(points)))))
+    cell_size = np.maximum((points.max(axis=0) - low) / cells, 1e-9)
+    column = np.clip(((points[:, 0] - low[0]) / cell_size[0]).astype(np.int64), 0, cells - 1)
+    row = np.clip(((points[:, 1] - low[1]) / cell_size[1]).astype(np.int64), 0, cells - 1)
+    # Cell numbers fit in int16, which NumPy sorts with a radix sort
+    cell = (row * cells + column).astype(np.int16)
+    order = np.argsort(cell, kind="stable")
+    cell_starts = np.searchsorted(cell[order], np.arange(cells * cells + 1))
+
+    # Each triangle visits the run of points in its cells on every row of cells
+    def cell_range(low_edge, high_edge, axis):
+        first = np.floor((low_edge - low[axis]) / cell_size[axis])
+        last = np.floor((high_edge - low[axis]) / cell_size[axis])
+        return np.clip(first, 0, cells).astype(np.int64), np.clip(last, -1, cells - 1).astype(np.int64)
+
+    first_column, last_column = cell_range(x_min, x_max, 0)
+    first_row, last_row = cell_range(y_min, y_max, 1)
+    row_counts = np.where(first_column <= last_column, np.maximum(last_row - first_row + 1, 0), 0)
+    owner = np.repeat(np.arange(len(edges)), row_counts)
+    cell_rows = _ranges(first_row, row_counts)
+    run_starts = cell_starts[cell_rows * cells + first_column[owner]]
+    run_counts = cell_starts[cell_rows * cells + last_column[owner] + 1] - run_starts
+    owner = np.repeat(owner, run_counts)
+    candidates = order[_ranges(run_starts, run_counts)]
+
+    # One row per candidate, one column per side of its triangle
+    crossed = _crossings(sides[owner], points[candidates, 0, None], points[candidates, 1, None])
+    parity = np.bitwise_xor.reduce(crossed, axis=1)
+    result[:] = np.bincount(candidates[parity], minlength=len(points)) % 2 == 1
+    return result
+
+
+def triangle_mask(vertices, edges: np.ndarray, x0: int, y0: int, x1: int, y1: int, sides: np.ndarray = None) -> np.ndarray:
+    """
+    Fill a triangulated polygon with a half-space rasterizer.
+
+    For integer pixels, x < crossing is the same as x < ceil(crossing), so
+    every side of a triangle is resolved once per row of the triangle's
+    bounding box: the pixels left of it are toggled. The toggles of all
+    triangles (diagonals toggle twice and cancel) are summed per pixel in one
+    vectorized pass. The mask is identical to scanline_mask.
+
+    Parameters:
+    - vertices: An (N, 2) array of polygon vertices.
+    - edges (np.ndarray): The (T, 3, 2) oriented edges from triangle_edges.
+    - x0, y0, x1, y1 (int): The pixel box to fill (x1/y1 exclusive).
+    - sides (np.ndarray, optional): The table from edge_coefficients. Defaults to None (built here).
+
+    Returns:
+    - mask (np.ndarray): A (y1 - y0, x1 - x0) boolean array.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    if sides is None:
+        sides = edge_coefficients(vertices, edges)
+    width = x1 - x0
+    height = y1 - y0
+    _, y_min, _, y_max = _triangle_bounds(vertices, edges)
+
+    # Rows of every triangle's bounding box, clipped to the box
+    top = np.clip(np.ceil(y_min).astype(np.int64), y0, y1)
+    bottom = np.clip(np.floor(y_max).astype(np.int64) + 1, y0, y1)
+    counts = np.maximum(bottom - top, 0)
+    owner = np.repeat(np.arange(len(edges)), counts)
+    rows = _ranges(top, counts)
+
+    # Where every side crosses every row: pixels left of the crossing are toggled
+    xi, yi, yj, dx, dy = np.moveaxis(sides[owner], 2, 0)
+    y = rows[:, None].astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        crosses = (yi > y) != (yj > y)
+        ends = np.clip(np.ceil(dx * (y - yi) / dy + xi)[crosses], x0, x1).astype(np.int64) - x0
+    row_starts = np.broadcast_to((rows[:, None] - y0) * (width + 1), crosses.shape)[crosses]
+
+    # A toggle at the start of the row and one at the end of the span, summed along the row
+    toggles = np.bincount(
+        np.concatenate((row_starts, row_starts + ends)), minlength=height * (width + 1)
+    ).reshape(height, width + 1)
+    return (np.cumsum(toggles, axis=1)[:, :width] % 2) == 1
+
+
+def spans_to_mask(starts: np.ndarray, ends: np.ndarray, width: int) -> np.ndarray:
+    """
+    Expand per-row spans into a boolean mask.
+
+    Parameters:
+    - starts (np.ndarray): An (R, K) array of span starts, already clipped to [0, width].
+    - ends (np.ndarray): An (R, K) array of span ends (exclusive), clipped to [0, width].
+    - width (int): The width of the mask.
+
+    Returns:
+    - mask (np.ndarray): An (R, width) boolean array.
+    """
+    n_rows = starts.shape[0]
+    stride = width + 1
+    offsets = (np.arange(n_rows) * stride)[:, None]
+    size = n_rows * stride
+
+    diff = np.bincount((starts + offsets).ravel(), minlength=size)
+    diff -= np.bincount((ends + offsets).ravel(), minlength=size)
+    coverage = np.cumsum(diff.reshape(n_rows, stride)[:, :width], axis=1)
+    return coverage > 0
+
+
+def line_corners(start, end, half_width: float, cap: str = "square") -> np.ndarray:
+    """
+    Return the four corners of the band covered by a thick line.
+
+    Parameters:
+    - start, end: The (x, y) end points of the line.
+    - half_width (float): Half the width of the band.
+    - cap (str, optional): "square" extends the band by half_width past both end
+      points, "butt" and "round" stop at the end points. Defaults to "square".
+
+    Returns:
+    - corners (np.ndarray): A (4, 2) array of corners in drawing order.
+    """
+    start = np.asarray(start, dtype=float)
+    end = np.asarray(end, dtype=float)
+    direction = (end - start) / math.hypot(*(end - start))
+    normal = np.array([-direction[1], direction[0]]) * half_width
+
+    if cap == "square":
+        start = start - direction * half_width
+        end = end + direction * half_width
+
+    return np.array([start + normal, end + normal, end - normal, start - normal])
+
+
+def bresenham(x0: int, y0: int, x1: int, y1: int):
+    """
+    Integer Bresenham line between two pixels, vectorized.
+
+    Parameters:
+    - x0, y0, x1, y1 (int): The end pixels (both included).
+
+    Returns:
+    - (xs, ys) integer arrays of the pixels on the line, from the start pixel.
+    """
+    dx = x1 - x0
+    dy = y1 - y0
+    steps = np.arange(max(abs(dx), abs(dy)) + 1)
+    if len(steps) == 1:
+        return np.array([x0]), np.array([y0])
+
+    # Step along the major axis; the minor axis rounds the exact position half up
+    sx = 1 if dx >= 0 else -1
+    sy = 1 if dy >= 0 else -1
+    if abs(dx) >= abs(dy):
+        xs = x0 + sx * steps
+        ys = y0 + sy * ((2 * steps * abs(dy) + abs(dx)) // (2 * abs(dx)))
+    else:
+        ys = y0 + sy * steps
+        xs = x0 + sx * ((2 * steps * abs(dx) + abs(dy)) // (2 * abs(dy)))
+    return xs, ys
+
+
+def thin_line_mask(start, end, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+    """
+    Rasterize a one pixel wide line into a pixel box.
+
+    Parameters:
+    - start, end: The (x, y) end points, rounded to the nearest pixel.
+    - x0, y0, x1, y1 (int): The pixel box (x1/y1 exclusive).
+
+    Returns:
+    - mask (np.ndarray): A (y1 - y0, x1 - x0) boolean array.
+    """
+    xs, ys = bresenham(
+        math.floor(start[0] + 0.5), math.floor(start[1] + 0.5),
+        math.floor(end[0] + 0.5), math.floor(end[1] + 0.5),
+    )
+    inside = (xs >= x0) & (xs < x1) & (ys >= y0) & (ys < y1)
+
+    mask = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+    mask[ys[inside] - y0, xs[inside] - x0] = True
+    return mask
+
+
+def grow_bounds(bbox, margin: float):
+    """Grow an (x_min, y_min, x_max, y_max) bounding box by margin on every side."""
+    x_min, y_min, x_max, y_max = bbox
+    return x_min - margin, y_min - margin, x_max + margin, y_max + margin
+
+
+def edge_coverage(signed_distance: np.ndarray) -> np.ndarray:
+    """
+    Turn signed distances from pixel centers to a shape's edge into coverage.
+
+    A pixel whose center lies on the edge is half covered, and coverage falls
+    off linearly to nothing half a pixel outside (or full half a pixel inside),
+    which is the exact box filter for a straight edge along either axis.
+
+    Parameters:
+    - signed_distance (np.ndarray): Distances to the edge, positive inside.
+
+    Returns:
+    - coverage (np.ndarray): A uint8 array of the same shape, 0 (empty) to 255 (full).
+    """
+    coverage = np.clip(signed_distance + 0.5, 0.0, 1.0)
+    return (coverage * 255.0 + 0.5).astype(np.uint8)
+
+
+def segment_distance(starts, ends, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+    """
+    Distance from every pixel center of a box to the nearest of many segments.
+
+    Parameters:
+    - starts (np.ndarray): An (E, 2) array of segment start points.
+    - ends (np.ndarray): An (E, 2) array of segment end points.
+    - x0, y0, x1, y1 (int): The pixel box (x1/y1 exclusive).
+
+    Returns:
+    - distance (np.ndarray): A (y1 - y0, x1 - x0) float array.
+    """
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+    height = y1 - y0
+    width = x1 - x0
+    ys = np.arange(y0, y1, dtype=float)[None, :, None]
+    xs = np.arange(x0, x1, dtype=float)[None, None, :]
+
+    distance_squared = np.full((height, width), np.inf)
+
+    # Work through the edges in chunks so (edges, height, width) stays small
+    chunk = max(1, (1 << 18) // max(1, height * width))
+    for first in range(0, len(starts), chunk):
+        ax, ay = starts[first:first + chunk, 0, None, None], starts[first:first + chunk, 1, None, None]
+        dx = ends[first:first + chunk, 0, None, None] - ax
+        dy = ends[first:first + chunk, 1, None, None] - ay
+        length_squared = dx * dx + dy * dy
+        length_squared[length_squared == 0] = 1.0
+
+        # Project every pixel center onto every segment, clamped to its ends
+        t = np.clip(((xs - ax) * dx + (ys - ay) * dy) / length_squared, 0.0, 1.0)
+        px = xs - ax - t * dx
+        py = ys - ay - t * dy
+        np.minimum(distance_squared, (px * px + py * py).min(axis=0), out=distance_squared)
+
+    return np.sqrt(distance_squared)
+
+
+def polygon_coverage(rings: list, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+    """
+    Anti-aliased coverage of one or more polygon rings over a pixel box.
+
+    Pixels are inside by the even-odd rule over all rings (so an outline is
+    its outer ring plus its inner ring), and coverage comes from the distance
+    of each pixel center to the nearest edge of any ring.
+
+    Parameters:
+    - rings (list): (N, 2) vertex arrays, one per ring.
+    - x0, y0, x1, y1 (int): The pixel box (x1/y1 exclusive).
+
+    Returns:
+    - coverage (np.ndarray): A (y1 - y0, x1 - x0) uint8 array, 0 to 255.
+    """
+    rings = [np.asarray(ring, dtype=float) for ring in rings]
+
+    inside = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+    for ring in rings:
+        inside ^= scanline_mask(ring, x0, y0, x1, y1)
+
+    starts = np.vstack(rings)
+    ends = np.vstack([np.roll(ring, -1, axis=0) for ring in rings])
+    distance = segment_distance(starts, ends, x0, y0, x1, y1)
+    return edge_coverage(np.where(inside, distance, -distance))
+
+
+def _pad_rows(arrays, fill):
+    """Stack 1-D arrays of different lengths into a 2-D array padded with fill."""
+    longest = max(len(a) for a in arrays)
+    stacked = np.full((len(arrays), longest), fill, dtype=float)
+    for i, a in enumerate(arrays):
+        stacked[i, :len(a)] = a
+    return stacked
+
+
+def scanline_masks(polygons: list, boxes: list) -> list:
+    """
+    Scanline fill many polygons in one vectorized pass.
+
+    The edge tables of all polygons are stacked (padded with edges that never
+    cross a scanline) so the crossings, sorting and span expansion run once
+    for the whole batch. Results are identical to calling scanline_mask on
+    each polygon.
+
+    Parameters:
+    - polygons (list): (N, 2) vertex arrays, one per polygon.
+    - boxes (list): (x0, y0, x1, y1) pixel boxes, one per polygon.
+
+    Returns:
+    - A list of boolean masks, one per polygon, shaped like its box.
+    """
+    boxes_arr = np.asarray(boxes, dtype=np.int64)
+    x0 = boxes_arr[:, 0, None, None]
+    x1 = boxes_arr[:, 2, None, None]
+    heights = boxes_arr[:, 3] - boxes_arr[:, 1]
+    widths = boxes_arr[:, 2] - boxes_arr[:, 0]
+    max_height = int(heights.max())
+    max_width = int(widths.max())
+
+    # Stacked edge table, edge i runs from vertex i-1 to vertex i
+    polygons = [np.asarray(v, dtype=float) for v in polygons]
+    xi = _pad_rows([v[:, 0] for v in polygons], np.nan)[:, None, :]
+    yi = _pad_rows([v[:, 1] for v in polygons], np.nan)[:, None, :]
+    xj = _pad_rows([np.roll(v[:, 0], 1) for v in polygons], np.nan)[:, None, :]
+    yj = _pad_rows([np.roll(v[:, 1], 1) for v in polygons], np.nan)[:, None, :]
+
+    # Scanlines of every polygon, rows past a polygon's height are NaN and never cross
+    rows = boxes_arr[:, 1, None] + np.arange(max_height)
+    rows = np.where(np.arange(max_height) < heights[:, None], rows, np.nan)[:, :, None]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        crosses = (yi > rows) != (yj > rows)
+        crosses &= ~np.isnan(rows) & ~np.isnan(yi)
+        x_cross = (xj - xi) * (rows - yi) / (yj - yi + 1e-12) + xi
+    x_cross = np.where(crosses, x_cross, np.inf)
+    if x_cross.shape[2] % 2:
+        x_cross = np.concatenate((x_cross, np.full(x_cross.shape[:2] + (1,), np.inf)), axis=2)
+    x_cross.sort(axis=2)
+
+    spans = (np.clip(np.ceil(x_cross), x0, x1) - x0).astype(np.int64)
+    spans = spans.reshape(-1, spans.shape[2])
+    masks = spans_to_mask(spans[:, 0::2], spans[:, 1::2], max_width)
+    masks = masks.reshape(len(polygons), max_height, max_width)
+
+    return [masks[i, :heights[i], :widths[i]] for i in range(len(polygons))]
+
+
+def disc_masks(centers, radii_squared, boxes: list) -> list:
+    """
+    Rasterize many filled circles in one vectorized pass.
+
+    Parameters:
+    - centers: An (N, 2) array of circle centers.
+    - radii_squared: An (N,) array of squared radii.
+    - boxes (list): (x0, y0, x1, y1) pixel boxes, one per circle.
+
+    Returns:
+    - A list of boolean masks, one per circle, shaped like its box.
+    """
+    centers = np.asarray(centers, dtype=float)
+    radii_squared = np.asarray(radii_squared, dtype=float)
+    boxes_arr = np.asarray(boxes, dtype=np.int64)
+    heights = boxes_arr[:, 3] - boxes_arr[:, 1]
+    widths = boxes_arr[:, 2] - boxes_arr[:, 0]
+
+    dx = boxes_arr[:, 0, None] + np.arange(int(widths.max())) - centers[:, 0, None]
+    dy = boxes_arr[:, 1, None] + np.arange(int(heights.max())) - centers[:, 1, None]
+    dist_sq = (dx * dx)[:, None, :] + (dy * dy)[:, :, None]
+    masks = dist_sq <= radii_squared[:, None, None]
+
+    return [masks[i, :heights[i], :widths[i]] for i in range(len(boxes))]
+
+
+def _keys_match(a, b) -> bool:
+    """Compare two cache keys, allowing float noise in geometry arrays."""
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        return len(a) == len(b) and all(_keys_match(x, y) for x, y in zip(a, b))
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return (
+            isinstance(a, np.ndarray) and isinstance(b, np.ndarray) and a.shape == b.shape
+            and bool((np.abs(a - b) <= KEY_TOLERANCE).all())
+        )
+    return a == b
+
+
+def _normalize_key(key):
+    """Turn a mask cache key into a hashable value, rounding away float noise."""
+    if isinstance(key, np.ndarray):
+        # Adding 0.0 folds -0.0 into 0.0 so both hash the same
+        return key.shape, (np.round(key, KEY_DECIMALS) + 0.0).tobytes()
+    if isinstance(key, (tuple, list)):
+        return tuple(_normalize_key(k) for k in key)
+    if isinstance(key, (float, np.floating)):
+        return round(float(key), KEY_DECIMALS) + 0.0
+    if isinstance(key, np.integer):
+        return int(key)
+    return key
+
+
+class RasterCache:
+    """
+    Process-wide LRU cache of rasterized masks, keyed by normalized geometry.
+
+    Shapes that are built fresh every frame with the same geometry (snake
+    segments, letters, disc and ring stamps) share one mask here instead of
+    being rasterized again. The default entry limit fits a ring that spans
+    the whole 128x128 wall. Keys hold the geometry relative to the shape's
+    origin plus the sub-pixel phase of that origin, so any whole-pixel
+    translation of a shape maps to the same entry. It can be used from
+    several rendering threads at once.
+
+    A mask is only admitted the second time its key is seen: shapes that
+    rotate or move by fractions of a pixel make a new key every frame, and
+    would otherwise push the glyphs and stamps that repeat out of the cache.
+
+    Attributes:
+    - enabled (bool): Turn the cache on or off. Defaults to True.
+    - max_bytes (int): Memory budget for all cached masks.
+    - max_entry_pixels (int): Masks bigger than this are never cached.
+    - max_candidates (int): How many keys seen once are remembered.
+    - hits, misses, evictions (int): Usage counters.
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, max_entry_pixels: int = 256 * 256, max_candidates: int = 1024):
+        self.enabled = True
+        self.max_bytes = max_bytes
+        self.max_entry_pixels = max_entry_pixels
+        self.max_candidates = max_candidates
+        self.entries = OrderedDict()
+        self.candidates = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def configure(self, max_bytes: int = None, max_entry_pixels: int = None, enabled: bool = None) -> None:
+        """
+        Change the cache limits, evicting entries if the new budget is smaller.
+
+        Parameters:
+        - max_bytes (int, optional): Memory budget for all cached masks.
+        - max_entry_pixels (int, optional): Largest mask (in pixels) that is cached.
+        - enabled (bool, optional): Turn the cache on or off.
+        """
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        if max_entry_pixels is not None:
+            self.max_entry_pixels = max_entry_pixels
+        if enabled is not None:
+            self.enabled = enabled
+        with self._lock:
+            self._evict()
+
+    def get(self, key):
+        """Return the (box, mask) entry for key, or None, updating the counters."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def admit(self, key) -> bool:
+        """Whether a missed key has been seen before; the first sighting is only remembered."""
+        with self._lock:
+            if self.candidates.pop(key, None) is not None:
+                return True
+
+            self.candidates[key] = True
+            if len(self.candidates) > self.max_candidates:
+                self.candidates.popitem(last=False)
+            return False
+
+    def put(self, key, box, mask) -> None:
+        """Store a read-only mask rendered over box (relative to the shape's anchor)."""
+        mask.flags.writeable = False
+        with self._lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1].nbytes
+
+            self.entries[key] = (box, mask)
+            self.bytes += mask.nbytes
+            self._evict()
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self.entries.clear()
+            self.candidates.clear()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """Return the cache counters and memory use."""
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _evict(self) -> None:
+        while self.entries and self.bytes > self.max_bytes:
+            _, (_, mask) = self.entries.popitem(last=False)
+            self.bytes -= mask.nbytes
+            self.evictions += 1
+
+
+# The process-wide cache shared by every shape
+shared_cache = RasterCache()
+
+
+class MaskCache:
+    """
+    Remembers the last coverage mask of a single shape.
+
+    The cache is keyed by the shape's geometry relative to an origin point.
+    When the key still matches and the origin has moved by whole pixels, the
+    cached mask is shifted instead of rasterizing again. Masks are rendered
+    over the shape's bounding box clipped to the canvas grown by MASK_PAD
+    pixels on every side, so shapes that move across the edge keep hitting
+    the cache.
+
+    Shareable caches also go through shared_cache: once the same geometry
+    has been seen twice, its mask is rendered over the whole bounding box
+    and reused by every shape with that geometry.
+    """
+
+    def __init__(self, shareable: bool = False):
+        self.shareable = shareable
+        self.key = None
+        self.origin = None
+        self.box = None
+        self.mask = None
+
+    def invalidate(self) -> None:
+        """Forget the cached mask."""
+        self.key = None
+        self.mask = None
+
+    def __getstate__(self):
+        """Pickled shapes (display lists sent to a render process) leave their masks behind."""
+        state = self.__dict__.copy()
+        state.update(key=None, origin=None, box=None, mask=None)
+        return state
+
+    def lookup(self, key, origin, bounds):
+        """
+        Find the coverage of a canvas region in the cached mask.
+
+        Parameters:
+        - key: The shape's geometry relative to its origin.
+        - origin: The (x, y) origin of the shape.
+        - bounds (tuple): The (x0, y0, x1, y1) canvas region that is needed.
+
+        Returns:
+        - (x0, y0, mask) for the region, or None on a cache miss.
+        """
+        if self.mask is None or not _keys_match(key, self.key):
+            return None
+
+        dx = float(origin[0]) - self.origin[0]
+        dy = float(origin[1]) - self.origin[1]
+        shift_x = round(dx)
+        shift_y = round(dy)
+        if abs(dx - shift_x) > KEY_TOLERANCE or abs(dy - shift_y) > KEY_TOLERANCE:
+            return None
+
+        # The cached box moved along with the shape
+        box_x0 = self.box[0] + shift_x
+        box_y0 = self.box[1] + shift_y
+        x0, y0, x1, y1 = bounds
+        if (x0 < box_x0 or y0 < box_y0 or
+                x1 > box_x0 + self.mask.shape[1] or y1 > box_y0 + self.mask.shape[0]):
+            return None
+
+        return x0, y0, self.mask[y0 - box_y0:y1 - box_y0, x0 - box_x0:x1 - box_x0]
+
+    def store(self, key, origin, box, mask) -> None:
+        """Remember the mask rendered for box while the shape was at origin."""
+        self.key = key
+        self.origin = (float(origin[0]), float(origin[1]))
+        self.box = box
+        self.mask = mask
+
+    def prepare(self, key, origin, bbox, width: int, height: int, render, exclusive: bool = False):
+        """
+        Work out which pixel box still has to be rendered after a cache miss.
+
+        Shareable masks found in shared_cache are stored straight away.
+
+        Parameters:
+        - key: The shape's geometry relative to its origin.
+        - origin: The (x, y) origin of the shape.
+        - bbox (tuple): The (x_min, y_min, x_max, y_max) bounding box of the shape.
+        - width (int): The width of the canvas.
+        - height (int): The height of the canvas.
+        - render: The function that rasterizes a pixel box for this shape.
+        - exclusive (bool, optional): Whether x_max/y_max are exclusive. Defaults to False.
+
+        Returns:
+        - (box, shared) where box is the (x0, y0, x1, y1) region to render, or
+          None if nothing needs rendering, and shared is passed on to finish.
+        """
+        if self.shareable and shared_cache.enabled:
+            box = clip_bounds(*bbox, 0, 0, exclusive=exclusive, pad=math.inf)
+            if box is not None and (box[2] - box[0]) * (box[3] - box[1]) <= shared_cache.max_entry_pixels:
+                anchor_x = math.floor(origin[0])
+                anchor_y = math.floor(origin[1])
+                shared_key = (
+                    getattr(render, "__func__", render), _normalize_key(key),
+                    _normalize_key(float(origin[0]) - anchor_x), _normalize_key(float(origin[1]) - anchor_y),
+                )
+
+                entry = shared_cache.get(shared_key)
+                if entry is not None:
+                    (x0, y0, x1, y1), mask = entry
+                    self.store(key, origin, (x0 + anchor_x, y0 + anchor_y, x1 + anchor_x, y1 + anchor_y), mask)
+                    return None, None
+
+                # Geometry seen for the first time is only rendered for this shape
+                if shared_cache.admit(shared_key):
+                    return box, (shared_key, anchor_x, anchor_y)
+
+        return clip_bounds(*bbox, width, height, exclusive=exclusive, pad=MASK_PAD), None
+
+    def finish(self, key, origin, box, mask, shared=None) -> None:
+        """Store a freshly rendered mask, sharing it if prepare asked for that."""
+        if shared is not None:
+            shared_key, anchor_x, anchor_y = shared
+            x0, y0, x1, y1 = box
+            shared_cache.put(shared_key, (x0 - anchor_x, y0 - anchor_y, x1 - anchor_x, y1 - anchor_y), mask)
+        self.store(key, origin, box, mask)
+
+    def rasterize(self, key, origin, bbox, width: int, height: int, render, exclusive: bool = False):
+        """
+        Rasterize a shape through the cache.
+
+        Parameters:
+        - key: The shape's geometry relative to its origin.
+        - origin: The (x, y) origin of the shape.
+        - bbox (tuple): The (x_min, y_min, x_max, y_max) bounding box of the shape.
+        - width (int): The width of the canvas.
+        - height (int): The height of the canvas.
+        - render: A function (x0, y0, x1, y1) -> mask that rasterizes a pixel box.
+        - exclusive (bool, optional): Whether x_max/y_max are exclusive. Defaults to False.
+
+        Returns:
+        - (x0, y0, mask) for the visible part of the shape, or None if it is off-canvas.
+        """
+        bounds = clip_bounds(*bbox, width, height, exclusive=exclusive)
+        if bounds is None:
+            return None
+
+        cached = self.lookup(key, origin, bounds)
+        if cached is not None:
+            return cached
+
+        box, shared = self.prepare(key, origin, bbox, width, height, render, exclusive)
+        if box is not None:
+            self.finish(key, origin, box, render(*box), shared)
+        return self.lookup(key, origin, bounds)
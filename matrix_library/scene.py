@@ -0,0 +1,180 @@
+import numpy as np
+from matrix_library import raster
+
+
+class Node:
+    def __init__(self, item, z: int, order: int):
+        """
+        A shape held by a Scene.
+
+        Attributes:
+        - item: The shape, bitmap or phrase.
+        - z (int): The depth of the node; higher z is drawn on top.
+        - order (int): When the node was added, to keep equal z in insertion order.
+        - raster (tuple): The (x0, y0, source, mask) the node was last drawn with, or None.
+        - dirty (bool): Rasterize and redraw the node on the next render even if it looks unchanged.
+        """
+        self.item = item
+        self.z = z
+        self.order = order
+        self.raster = None
+        self.dirty = True
+
+
+class Scene:
+    def __init__(self, canvas, background: tuple = (0, 0, 0)):
+        """
+        A retained-mode scene that keeps a canvas up to date.
+
+        Items are added once and then changed in place (moved, recolored, new
+        text). Each render checks every node, and only the regions under the
+        nodes that changed are repainted: the background is filled in and every
+        node overlapping the region is composited again, in z-order, from the
+        raster it was last drawn with. Unchanged nodes are never rasterized again.
+
+        The scene owns the canvas contents: call render() and draw() each frame
+        instead of clear(), add() and draw(). Anything that changes an item
+        without changing its raster (editing a bitmap's color array in place)
+        must be reported with invalidate().
+
+        Parameters:
+        - canvas (Canvas): The canvas to draw on.
+        - background (tuple, optional): The color behind every node. Defaults to (0, 0, 0).
+        """
+        self.canvas = canvas
+        self.background = background
+        self.nodes = []
+        self._by_id = {}
+        self._order = 0
+        self._removed = []
+        self._sorted = True
+        self._full = True
+        self._repaints = None
+
+    def add(self, item, z: int = 0):
+        """
+        Adds an item to the scene.
+
+        Parameters:
+        - item: The shape, bitmap or phrase to show.
+        - z (int, optional): The depth of the item; higher z is drawn on top. Defaults to 0.
+
+        Returns:
+        - item: The item, so it can be created and added in one line.
+        """
+        if id(item) in self._by_id:
+            self.set_z(item, z)
+            return item
+
+        node = Node(item, z, self._order)
+        self._order += 1
+        self.nodes.append(node)
+        self._by_id[id(item)] = node
+        self._sorted = False
+        return item
+
+    def remove(self, item) -> None:
+        """Removes an item from the scene, repainting what was under it."""
+        node = self._by_id.pop(id(item), None)
+        if node is None:
+            return
+        self.nodes.remove(node)
+        if node.raster is not None:
+            self._removed.append(raster.raster_box(node.raster))
+
+    def set_z(self, item, z: int) -> None:
+        """Moves an item to a new depth."""
+        node = self._by_id[id(item)]
+        if node.z != z:
+            node.z = z
+            node.dirty = True
+            self._sorted = False
+
+    def invalidate(self, item=None) -> None:
+        """
+        Forces an item (or, with no item, the whole scene) to be redrawn on the next render.
+
+        Parameters:
+        - item (optional): The item that changed. Defaults to None (everything).
+        """
+        if item is None:
+            self._full = True
+        else:
+            self._by_id[id(item)].dirty = True
+
+    def set_background(self, color: tuple) -> None:
+        """Changes the background color, repainting the whole scene."""
+        self.background = color
+        self._full = True
+
+    def render(self) -> list:
+        """
+        Brings the canvas up to date with the scene.
+
+        Returns:
+        - regions (list): The (x0, y0, x1, y1) rectangles that were repainted.
+        """
+        canvas = self.canvas
+        width, height = canvas.width, canvas.height
+
+        if not self._sorted:
+            self.nodes.sort(key=lambda node: (node.z, node.order))
+            self._sorted = True
+
+        # Somebody cleared or filled the canvas behind the scene's back
+        if self._repaints != canvas._repaints:
+            self._full = True
+
+        damage = self._removed
+        self._removed = []
+        if self._full:
+            damage.append((0, 0, width, height))
+
+        # Find the nodes whose raster changed; unchanged ones hit their mask caches
+        for node in self.nodes:
+            current = canvas._rasterize(node.item)
+            if current is not None and np.ndim(current[2]) != 3:
+                # Copy the color so changing it in place still counts as a change
+                current = current[:2] + (tuple(current[2]),) + current[3:]
+
+            if node.dirty or not _same_raster(current, node.raster):
+                if node.raster is not None:
+                    damage.append(raster.raster_box(node.raster))
+                if current is not None:
+                    damage.append(raster.raster_box(current))
+                node.raster = current
+                node.dirty = False
+
+        regions = raster.merge_boxes(damage, width, height)
+        frame = canvas._back_buffer()
+        for box in regions:
+            x0, y0, x1, y1 = box
+            frame[y0:y1, x0:x1] = self.background[:3]
+            canvas.mark_dirty(box)
+            for node in self.nodes:
+                canvas._composite(node.raster, clip=box)
+
+        self._full = False
+        self._repaints = canvas._repaints
+        return regions
+
+
+def _same_array(a, b) -> bool:
+    """Whether two arrays are the same view of the same memory (cached masks are never changed in place)."""
+    if a is None or b is None:
+        return a is b
+    return (
+        a.__array_interface__["data"][0] == b.__array_interface__["data"][0]
+        and a.shape == b.shape and a.strides == b.strides and a.dtype == b.dtype
+    )
+
+
+def _same_raster(a, b) -> bool:
+    """Whether two rasters draw exactly the same thing."""
+    if a is None or b is None:
+        return a is b
+    if a[0] != b[0] or a[1] != b[1] or not _same_array(a[3], b[3]):
+        return False
+    if isinstance(a[2], tuple) or isinstance(b[2], tuple):
+        return a[2] == b[2]
+    return _same_array(a[2], b[2])
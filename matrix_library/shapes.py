@@ -1,24 +1,64 @@
-from matrix_library import utils
+from matrix_library import font, raster
 import numpy as np
 import math
 import os
+from collections import OrderedDict
+import itertools
 
 # load pygame
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 import pygame
 
-# Init some variables to reduce overhead
-empty_canvas = np.zeros((128 * 128), dtype=bool)
+# Stamps every tracked attribute change, in order
+_change_clock = itertools.count(1)
 
 
-class Polygon:
-    def __init__(self, vertices: list, color: tuple = (255, 255, 255)):
+class Tracked:
+    """
+    Base of the drawable items: remembers when each attribute was last assigned.
+
+    A RenderPipeline uses this to send a resident item only the attributes that
+    changed since the previous frame, without pickling the rest. Assignments are
+    recorded on their own; an attribute edited in place (an array or list
+    changed without assigning it again) has to be passed to mark_changed().
+    """
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        try:
+            self._changes[name] = next(_change_clock)
+        except AttributeError:
+            object.__setattr__(self, "_changes", {name: next(_change_clock)})
+
+    def mark_changed(self, *names: str) -> None:
+        """Record attributes that were edited in place as changed."""
+        changes = self.__dict__.setdefault("_changes", {})
+        for name in names:
+            changes[name] = next(_change_clock)
+
+    def changed_since(self, stamp: int = 0):
+        """
+        Find the attributes changed after a stamp.
+
+        Parameters:
+        - stamp (int, optional): A stamp returned by an earlier call. Defaults to 0 (every attribute).
+
+        Returns:
+        - (names, stamp): The names of the attributes changed since stamp, and the stamp to pass next time.
+        """
+        names = [name for name, changed in self.__dict__.get("_changes", {}).items() if changed > stamp]
+        return names, next(_change_clock)
+
+
+class Polygon(Tracked):
+    def __init__(self, vertices: list, color: tuple = (255, 255, 255), antialias: bool = False):
         """
         Initializes a Polygon object with the given vertices and color.
 
         Parameters:
         - vertices (list): A list of vertices that define the polygon. Must have at least 3 vertices.
-        - color (tuple, optional): The color of the polygon. Defaults to (255, 255, 255).
+        - color (tuple, optional): The RGB or RGBA color of the polygon. Defaults to (255, 255, 255).
+        - antialias (bool, optional): Blend the edges by their pixel coverage. Defaults to False.
 
         Raises:
         - ValueError: If the number of vertices is less than 3.
@@ -28,11 +68,18 @@ class Polygon:
 
         self.vertices = np.array(vertices)
         self.color = color
+        self.antialias = antialias
         self.center = self.calculate_center()
         
         # Precompute bounding box for faster contains_points
         self._update_bounds()
 
+        # The vertices last triangulated, the triangles, their coverage and (edges, sides), built on first use
+        self._triangles = None
+
+        # Last coverage mask, reused while the polygon only moves by whole pixels
+        self._mask_cache = raster.MaskCache(shareable=True)
+
     def _update_bounds(self):
         """Update bounding box for faster point containment checks"""
         self.x_min = np.min(self.vertices[:, 0])
@@ -63,6 +110,15 @@ class Polygon:
         
         # Only process points inside the bounding box
         filtered_points = points[valid_mask]
+
+        # Many-sided polygons test each point only against the triangles around it
+        if len(self.vertices) >= raster.TRIANGULATE_MIN_VERTICES:
+            triangulation = self._triangulation()
+            if triangulation is not None:
+                edges, sides = triangulation
+                result = np.zeros(points.shape[0], dtype=bool)
+                result[valid_mask] = raster.points_in_triangles(self.vertices, edges, filtered_points, sides)
+                return result
         
         # Ray casting algorithm vectorized
         mask = np.zeros(filtered_points.shape[0], dtype=bool)
@@ -97,6 +153,110 @@ class Polygon:
         result[valid_mask] = mask
         return result
 
+    def _triangulation(self):
+        """
+        The polygon's triangulation as oriented edges and their coefficient table
+        (see raster.triangle_edges and raster.edge_coefficients).
+
+        The polygon is triangulated once per vertex set. Triangles are vertex
+        indices, so they follow the polygon through translate and rotate and
+        are only built again when the vertices change some other way. The
+        coefficient table is built again only when the vertices have moved.
+
+        Returns:
+        - (edges, sides) with a (T, 3, 2) edge array and a (T, 3, 5) table, or None
+          if the polygon cannot be triangulated.
+        """
+        vertices = np.asarray(self.vertices, dtype=float)
+        cached = self._triangles
+        if cached is not None and np.array_equal(cached[0], vertices):
+            return cached[3]
+
+        if cached is None or len(cached[0]) != len(vertices):
+            triangles = raster.triangulate(vertices)
+        elif cached[1] is not None and not math.isclose(
+            raster.triangle_coverage(vertices, cached[1]), cached[2], rel_tol=raster.KEY_TOLERANCE
+        ):
+            triangles = raster.triangulate(vertices)
+        else:
+            triangles = cached[1]
+
+        if triangles is None:
+            self._triangles = (vertices.copy(), None, None, None)
+            return None
+
+        if cached is not None and triangles is cached[1]:
+            coverage, (edges, _) = cached[2], cached[3]
+        else:
+            coverage = raster.triangle_coverage(vertices, triangles)
+            edges = raster.triangle_edges(triangles, len(vertices))
+        triangulation = (edges, raster.edge_coefficients(vertices, edges))
+        self._triangles = (vertices.copy(), triangles, coverage, triangulation)
+        return triangulation
+
+    def rasterize(self, width: int, height: int):
+        """
+        Scanline fill the polygon inside its bounding box on a canvas.
+
+        The mask is cached, so a polygon that is unchanged or only translated
+        by whole pixels since the last frame is not filled again.
+
+        Parameters:
+        - width (int): The width of the canvas.
+        - height (int): The height of the canvas.
+
+        Returns:
+        - (x0, y0, mask) where mask is a boolean array covering the canvas
+          region starting at (x0, y0), or None if the polygon is off-canvas.
+          Anti-aliased polygons return a uint8 coverage mask (0 to 255) instead.
+        """
+        key, origin, bbox, render, exclusive = self._raster_job(width, height)
+        return self._mask_cache.rasterize(key, origin, bbox, width, height, render, exclusive)
+
+    def _raster_job(self, width: int, height: int):
+        """
+        Everything needed to rasterize the polygon over any pixel box.
+
+        Returns:
+        - (key, origin, bbox, render, exclusive) as taken by MaskCache.rasterize.
+        """
+        if self.antialias:
+            return self._coverage_params() + (self._coverage_box, False)
+        return self._raster_params() + (self._rasterize_box, False)
+
+    def _raster_params(self):
+        """Cache key, origin and bounding box used to rasterize the polygon."""
+        # Bounds from the current vertices, which may have been assigned since _update_bounds
+        vertices = np.asarray(self.vertices, dtype=float)
+        origin = vertices[0]
+        bbox = (*vertices.min(axis=0), *vertices.max(axis=0))
+        return self._raster_key() - origin, origin, bbox
+
+    def _coverage_params(self):
+        """Cache key, origin and bounding box used to rasterize the anti-aliased polygon."""
+        key, origin, bbox = self._raster_params()
+        return ("antialias", key), origin, raster.grow_bounds(bbox, 0.5)
+
+    def _raster_key(self) -> np.ndarray:
+        """The geometry that decides the polygon's coverage."""
+        return np.asarray(self.vertices, dtype=float)
+
+    def _rasterize_box(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """
+        Scanline fill the polygon over a pixel box.
+
+        Fills stay on the scanline path rather than the triangles: over the
+        bounding box of a shape on a 128 pixel canvas the row-by-edge scan is
+        as fast or faster up to a few hundred vertices (the triangles also
+        walk the rows of every triangle's box), and the mask cache means it
+        only runs when the polygon moves by a fraction of a pixel or turns.
+        """
+        return raster.scanline_mask(self.vertices, x0, y0, x1, y1)
+
+    def _coverage_box(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Coverage of every pixel in a box from its distance to the nearest edge."""
+        return raster.polygon_coverage([self.vertices], x0, y0, x1, y1)
+
     def translate(self, dx: float, dy: float) -> None:
         """
         Translate the polygon by a specified distance along the x and y axes.
@@ -170,6 +330,16 @@ class Polygon:
         if min_x >= width or max_x < 0 or min_y >= height or max_y < 0:
             return mask
 
+        # Fill the triangles with the half-space rasterizer (the same pixels as testing every one),
+        # unless a subclass such as an outline tests points its own way
+        triangulation = self._triangulation() if type(self).contains_points is Polygon.contains_points else None
+        if triangulation is not None:
+            edges, sides = triangulation
+            mask[min_y:max_y + 1, min_x:max_x + 1] = raster.triangle_mask(
+                self.vertices, edges, min_x, min_y, max_x + 1, max_y + 1, sides
+            )
+            return mask
+
         # Generate coordinates within the bounding box
         y_coords, x_coords = np.meshgrid(
             np.arange(min_y, max_y + 1), 
@@ -217,15 +387,16 @@ def get_polygon_vertices(sides: int, radius: float = 1, center: tuple = (0, 0))
     return list(zip(x, y))
 
 
-class Circle:
-    def __init__(self, radius: float, center: tuple, color: tuple = (255, 255, 255)) -> None:
+class Circle(Tracked):
+    def __init__(self, radius: float, center: tuple, color: tuple = (255, 255, 255), antialias: bool = False) -> None:
         """
         Initializes a Circle object with the given center, radius, and color.
 
         Parameters:
         - center (tuple): The (x, y) coordinates of the circle's center.
         - radius (float): The radius of the circle.
-        - color (tuple, optional): The color of the circle. Defaults to (255, 255, 255).
+        - color (tuple, optional): The RGB or RGBA color of the circle. Defaults to (255, 255, 255).
+        - antialias (bool, optional): Blend the edge by its pixel coverage. Defaults to False.
         """
         if radius <= 0:
             raise ValueError("Radius must be greater than zero.")
@@ -233,10 +404,14 @@ class Circle:
         self.center = np.array(center)
         self.radius = radius
         self.color = color
+        self.antialias = antialias
         
         # Precompute for faster contains_points
         self.radius_squared = radius * radius
 
+        # Last coverage mask, reused while the circle only moves by whole pixels
+        self._mask_cache = raster.MaskCache(shareable=True)
+
     def get_circle_points(self) -> np.ndarray:
         """Get points on the circle's perimeter."""
         theta = np.linspace(0, 2 * np.pi, num=100)
@@ -275,6 +450,47 @@ class Circle:
         result[valid_mask] = inside_mask
         return result
 
+    def rasterize(self, width: int, height: int):
+        """Squared distance test limited to the circle's clipped bounding box."""
+        key, origin, bbox, render, exclusive = self._raster_job(width, height)
+        return self._mask_cache.rasterize(key, origin, bbox, width, height, render, exclusive)
+
+    def _raster_job(self, width: int, height: int):
+        """Everything needed to rasterize the circle over any pixel box (see Polygon._raster_job)."""
+        if self.antialias:
+            return self._coverage_params() + (self._coverage_box, False)
+        return self._raster_params() + (self._rasterize_box, False)
+
+    def _raster_params(self):
+        """Cache key, origin and bounding box used to rasterize the circle."""
+        cx, cy = self.center
+        bbox = (cx - self.radius, cy - self.radius, cx + self.radius, cy + self.radius)
+        return (self.radius, self.radius_squared), self.center, bbox
+
+    def _coverage_params(self):
+        """Cache key, origin and bounding box used to rasterize the anti-aliased circle."""
+        key, origin, bbox = self._raster_params()
+        return ("antialias", key), origin, raster.grow_bounds(bbox, 0.5)
+
+    def _rasterize_box(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """
+        Squared distance test over a pixel box.
+
+        Circles are shareable, so this runs once per (radius, sub-pixel phase)
+        and later circles are blitted from the stamp in raster.shared_cache.
+        """
+        cx, cy = self.center
+        y, x = np.ogrid[y0:y1, x0:x1]
+        dx = x - cx
+        dy = y - cy
+        return dx * dx + dy * dy <= self.radius_squared
+
+    def _coverage_box(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Coverage of every pixel in a box from its distance to the circle's edge."""
+        cx, cy = self.center
+        y, x = np.ogrid[y0:y1, x0:x1]
+        return raster.edge_coverage(self.radius - np.sqrt((x - cx) ** 2 + (y - cy) ** 2))
+
     def translate(self, dx: float, dy: float) -> None:
         """
         Translate the circle by a specified distance along the x and y axes.
@@ -332,42 +548,111 @@ class Circle:
 
 
 class Line(Polygon):
-    def __init__(self, start: list, end: list, color: list = (255, 255, 255), thickness: float = 0.5) -> None:
+    def __init__(self, start: list, end: list, color: list = (255, 255, 255), thickness: float = 0.5, cap: str = "square", antialias: bool = False) -> None:
+        """
+        Initializes a Line object between two points.
+
+        Lines with thickness 0.5 or less are drawn one pixel wide with integer
+        Bresenham; thicker lines are filled as a band 2 * thickness wide.
+        Anti-aliased lines are always at least one pixel wide.
+
+        Parameters:
+        - start (list): The (x, y) start point.
+        - end (list): The (x, y) end point.
+        - color (tuple, optional): The RGB or RGBA color of the line. Defaults to (255, 255, 255).
+        - thickness (float, optional): Half the width of the line. Defaults to 0.5.
+        - cap (str, optional): How thick lines end: "square" (extended by thickness),
+          "butt" (cut at the end points) or "round". Defaults to "square".
+        - antialias (bool, optional): Blend the edges by their pixel coverage. Defaults to False.
+
+        Raises:
+        - ValueError: If the end points are equal or malformed, or the thickness, color or cap is invalid.
+        """
         if start == end:
             raise ValueError("The start and end points of a line cannot be the same.")
         elif thickness <= 0:
             raise ValueError("The thickness of a line must be greater than 0.")
         elif len(start) != 2 or len(end) != 2:
             raise ValueError("The start and end points must be list of length 2.")
-        elif len(color) != 3:
-            raise ValueError("The color must be a list of length 3.")
+        elif len(color) not in (3, 4):
+            raise ValueError("The color must be a list of length 3 (RGB) or 4 (RGBA).")
+        elif cap not in ("square", "butt", "round"):
+            raise ValueError("The cap of a line must be 'square', 'butt' or 'round'.")
 
-        self.start = np.array(start)
-        self.end = np.array(end)
         self.thickness = thickness
-        
-        # Calculate length and angle more efficiently
-        dx = end[0] - start[0]
-        dy = end[1] - start[1]
-        self.length = math.sqrt((end[0] - start[0]) ** 2 + (end[1] - start[1]) ** 2)
-        
-        # Calculate the angle of the line
+        self.cap = cap
+        self.start = np.array(start, dtype=float)
+        self.end = np.array(end, dtype=float)
+        super().__init__(raster.line_corners(self.start, self.end, self.thickness, self.cap), color, antialias)
+        self._update_geometry()
+
+    def set_endpoints(self, start: list, end: list) -> None:
+        """
+        Move the line to new end points without building a new object.
+
+        Parameters:
+        - start (list): The new (x, y) start point.
+        - end (list): The new (x, y) end point.
+        """
+        if tuple(start) == tuple(end):
+            raise ValueError("The start and end points of a line cannot be the same.")
+
+        self.start = np.array(start, dtype=float)
+        self.end = np.array(end, dtype=float)
+        self._update_geometry()
+
+    def _update_geometry(self):
+        """Recompute the outline, bounds, length and angle from the end points"""
+        self.vertices = raster.line_corners(self.start, self.end, self.thickness, self.cap)
+        self.center = tuple((self.start + self.end) / 2)
+        self.length = math.hypot(*(self.end - self.start))
         self.angle = self.calculate_angle()
-        temp_end = [self.start[0], self.start[1] + self.length]
-
-        verts1 = [self.start[0] + self.thickness, self.start[1] + self.thickness]
-        verts2 = [self.start[0] + self.thickness, self.start[1] - self.thickness]
-        verts3 = [self.start[0] - self.thickness, self.start[1] - self.thickness]
-        verts4 = [self.start[0] - self.thickness, self.start[1] + self.thickness]
-        verts5 = [temp_end[0] - self.thickness, temp_end[1] - self.thickness]
-        verts6 = [temp_end[0] - self.thickness, temp_end[1] + self.thickness]
-        verts7 = [temp_end[0] + self.thickness, temp_end[1] + self.thickness]
-        verts8 = [temp_end[0] + self.thickness, temp_end[1] - self.thickness]
-        self.vertices = [verts1, verts2, verts3, verts4, verts5, verts6, verts7, verts8]
-        
-        # Create polygon and then rotate
-        super().__init__(self.vertices, color)
-        self.rotate(-self.angle, self.start)
+        self._update_bounds()
+
+    def _update_bounds(self):
+        """Bounds of the outline, widened to the pixels a thin line can touch"""
+        super()._update_bounds()
+        if self.thickness <= 0.5:
+            ends = np.floor(np.vstack((self.start, self.end)) + 0.5)
+            self.x_min = min(self.x_min, ends[:, 0].min())
+            self.x_max = max(self.x_max, ends[:, 0].max())
+            self.y_min = min(self.y_min, ends[:, 1].min())
+            self.y_max = max(self.y_max, ends[:, 1].max())
+
+    def translate(self, dx: float, dy: float) -> None:
+        """
+        Translate the line by a specified distance along the x and y axes.
+
+        Parameters:
+        - dx (float): The distance to translate along the x-axis.
+        - dy (float): The distance to translate along the y-axis.
+        """
+        self.start = self.start + (dx, dy)
+        self.end = self.end + (dx, dy)
+        self._update_geometry()
+
+    def rotate(self, angle_degrees: float, center: tuple = None) -> None:
+        """
+        Rotate the line by a specified angle around a given center.
+
+        Parameters:
+        - angle_degrees (float): The angle by which to rotate the line (in degrees).
+        - center (tuple, optional): The center of rotation (default is the middle of the line).
+        """
+        if center is None:
+            center = self.center
+
+        angle_radians = np.radians(angle_degrees)
+        cos_angle = np.cos(angle_radians)
+        sin_angle = np.sin(angle_radians)
+        rotation_matrix = np.array([
+            [cos_angle, -sin_angle],
+            [sin_angle, cos_angle]
+        ])
+
+        ends = np.dot(np.vstack((self.start, self.end)) - np.array(center), rotation_matrix.T) + np.array(center)
+        self.start, self.end = ends[0], ends[1]
+        self._update_geometry()
 
     def calculate_angle(self):
         """Calculate angle between line and positive y-axis"""
@@ -384,9 +669,45 @@ class Line(Polygon):
 
         return angle_deg
 
+    def _raster_params(self):
+        """Cache key, origin and bounding box used to rasterize the line."""
+        key = (tuple(self.end - self.start), self.thickness, self.cap)
+        return key, self.start, (self.x_min, self.y_min, self.x_max, self.y_max)
+
+    def _coverage_params(self):
+        """Cache key, origin and bounding box used to rasterize the anti-aliased line."""
+        key, origin, bbox = self._raster_params()
+        half_width = max(self.thickness, 0.5)
+        x_min, y_min = np.minimum(self.start, self.end) - half_width * math.sqrt(2)
+        x_max, y_max = np.maximum(self.start, self.end) + half_width * math.sqrt(2)
+        return ("antialias", key), origin, raster.grow_bounds((x_min, y_min, x_max, y_max), 0.5)
+
+    def _rasterize_box(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Bresenham for thin lines, scanline spans (plus round caps) for thick ones."""
+        if self.thickness <= 0.5:
+            return raster.thin_line_mask(self.start, self.end, x0, y0, x1, y1)
+
+        mask = raster.scanline_mask(self.vertices, x0, y0, x1, y1)
+        if self.cap == "round":
+            y, x = np.ogrid[y0:y1, x0:x1]
+            radius_squared = self.thickness * self.thickness
+            for cx, cy in (self.start, self.end):
+                mask |= (x - cx) ** 2 + (y - cy) ** 2 <= radius_squared
+        return mask
+
+    def _coverage_box(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Coverage of the band around the line, measured from its edges (or its axis for round caps)."""
+        half_width = max(self.thickness, 0.5)
+        if self.cap == "round":
+            distance = raster.segment_distance(self.start, self.end, x0, y0, x1, y1)
+            return raster.edge_coverage(half_width - distance)
+
+        corners = raster.line_corners(self.start, self.end, half_width, self.cap)
+        return raster.polygon_coverage([corners], x0, y0, x1, y1)
+
 
 class PolygonOutline(Polygon):
-    def __init__(self, vertices: tuple, color: tuple = (255, 255, 255), thickness: float = 1) -> None:
+    def __init__(self, vertices: tuple, color: tuple = (255, 255, 255), thickness: float = 1, antialias: bool = False) -> None:
         """
         Initializes a PolygonOutline object with the given vertices, color, and thickness.
 
@@ -394,6 +715,7 @@ class PolygonOutline(Polygon):
         - vertices (list): A list of vertices that define the polygon.
         - color (tuple, optional): The color of the polygon outline. Defaults to (255, 255, 255).
         - thickness (float, optional): The thickness of the polygon outline. Defaults to 1.
+        - antialias (bool, optional): Blend the edges by their pixel coverage. Defaults to False.
         """
         self.vertices = vertices
         self.color = color
@@ -412,9 +734,10 @@ class PolygonOutline(Polygon):
         self.inner_vertices = get_polygon_vertices(
             len(self.vertices), inner_radius, self.center
         )
+        self._inner = None
         
         # Initialize as polygon for inheritance
-        super().__init__(vertices, color)
+        super().__init__(vertices, color, antialias)
 
     def change_inner_vertices(self, inner_vertices) -> None:
         self.inner_vertices = inner_vertices
@@ -454,15 +777,38 @@ class PolygonOutline(Polygon):
     def contains_points(self, points: np.ndarray) -> np.ndarray:
         mask = np.zeros(len(points), dtype=bool)
 
-        poly1_mask = Polygon(self.vertices, self.color).contains_points(points)
-        poly2_mask = Polygon(self.inner_vertices, self.color).contains_points(points)
+        poly1_mask = Polygon.contains_points(self, points)
+        poly2_mask = self._inner_polygon().contains_points(points)
 
         mask = np.logical_and(poly1_mask, np.logical_not(poly2_mask))
         return mask
 
+    def _inner_polygon(self) -> Polygon:
+        """The inner outline as a Polygon, kept between calls so its triangulation is too."""
+        vertices = np.asarray(self.inner_vertices, dtype=float)
+        if self._inner is None or len(self._inner.vertices) != len(vertices):
+            self._inner = Polygon(vertices, self.color)
+        elif not np.array_equal(self._inner.vertices, vertices):
+            self._inner.vertices = vertices
+            self._inner._update_bounds()
+        return self._inner
+
+    def _raster_key(self) -> np.ndarray:
+        return np.vstack((np.asarray(self.vertices, dtype=float), np.asarray(self.inner_vertices, dtype=float)))
+
+    def _rasterize_box(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Scanline fill the outer polygon and cut the inner polygon out of it."""
+        outer = raster.scanline_mask(self.vertices, x0, y0, x1, y1)
+        inner = raster.scanline_mask(self.inner_vertices, x0, y0, x1, y1)
+        return outer & ~inner
+
+    def _coverage_box(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Coverage between the outer and inner polygons, measured from the nearest edge of either."""
+        return raster.polygon_coverage([self.vertices, self.inner_vertices], x0, y0, x1, y1)
+
 
 class CircleOutline(PolygonOutline):
-    def __init__(self, radius, center, color=(255, 255, 255), thickness=1):
+    def __init__(self, radius, center, color=(255, 255, 255), thickness=1, antialias=False):
         """
         Initializes a CircleOutline object with the given radius, center, color, and thickness.
 
@@ -471,11 +817,12 @@ class CircleOutline(PolygonOutline):
         - center (tuple): The center coordinates of the circle outline.
         - color (tuple, optional): The RGB color values of the circle outline. Defaults to (255, 255, 255).
         - thickness (float, optional): The thickness of the circle outline. Defaults to 1.
+        - antialias (bool, optional): Blend the edges by their pixel coverage. Defaults to False.
         """
         # Create many-sided polygon to approximate circle
         num_points = max(int(radius * 4), 24)  # Increase for smoother circles
         vertices = get_polygon_vertices(num_points, radius, center)
-        super().__init__(vertices, color, thickness)
+        super().__init__(vertices, color, thickness, antialias)
         self.radius = radius
         self.center = center
         
@@ -485,25 +832,77 @@ class CircleOutline(PolygonOutline):
         self.inner_radius_squared = self.inner_radius * self.inner_radius
 
     def contains_points(self, points: np.ndarray):
+        # Quick bounds check, the ring never reaches past its outer radius
+        x_min, y_min = np.asarray(self.center) - self.radius
+        x_max, y_max = np.asarray(self.center) + self.radius
+        valid_mask = (
+            (points[:, 0] >= x_min) &
+            (points[:, 0] <= x_max) &
+            (points[:, 1] >= y_min) &
+            (points[:, 1] <= y_max)
+        )
+
+        result = np.zeros(points.shape[0], dtype=bool)
+        if not np.any(valid_mask):
+            return result
+
         # More efficient implementation using distance calculation
         # instead of constructing temporary circles
-        distances = np.sqrt(np.sum((points - self.center) ** 2, axis=1))
+        distances = np.sqrt(np.sum((points[valid_mask] - self.center) ** 2, axis=1))
         
         # Points must be within outer radius but outside inner radius
+        result[valid_mask] = (distances <= self.radius) & (distances > self.inner_radius)
+        return result
+
+    def _raster_params(self):
+        cx, cy = self.center
+        bbox = (cx - self.radius, cy - self.radius, cx + self.radius, cy + self.radius)
+        return (self.radius, self.inner_radius), self.center, bbox
+
+    def _rasterize_box(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """
+        Distance test for the ring, limited to the circle's bounding box.
+
+        Rings are shareable, so this runs once per (radius, thickness, sub-pixel
+        phase) and later rings are blitted from the stamp in raster.shared_cache.
+        """
+        cx, cy = self.center
+        y, x = np.ogrid[y0:y1, x0:x1]
+        distances = np.sqrt((x - cx) ** 2 + (y - cy) ** 2)
         return (distances <= self.radius) & (distances > self.inner_radius)
 
+    def _coverage_box(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Coverage of the ring from each pixel's distance to the nearer of its two edges."""
+        cx, cy = self.center
+        y, x = np.ogrid[y0:y1, x0:x1]
+        distances = np.sqrt((x - cx) ** 2 + (y - cy) ** 2)
+        return raster.edge_coverage(np.minimum(self.radius - distances, distances - self.inner_radius))
 
-class Phrase:
-    def __init__(self, text: str, position: list = [0, 0], color: list = [255, 255, 255], size: int = 1, auto_newline: bool = False):
+
+class Phrase(Tracked):
+    def __init__(self, text: str, position: list = [0, 0], color: list = [255, 255, 255], size: int = 1, auto_newline: bool = False, wrap_width: int = None):
         self.text: str = text
         self.position: list = list(position)
         self.color = color
         self.auto_newline = auto_newline
         self.size: int = size
+
+        # Lines wrap at wrap_width, or by default at the width of the canvas the phrase is drawn on
+        self.wrap_width = wrap_width
+        self._line_width = wrap_width or 128
+        self.layout_version = 0
         self.letters = self.get_letters()
+
+        # Every letter's position, bounds, scale and atlas index, rebuilt when the layout changes
+        self._layout = None
+        self._glyphs = None
+        self._layout_key = None
         
         # Precompute bounds for faster checks
         self._update_bounds()
+
+        # Last coverage mask, reused while the phrase only moves by whole pixels
+        self._mask_cache = raster.MaskCache()
         
     def _update_bounds(self):
         """Calculate phrase bounds for faster containment checks"""
@@ -549,12 +948,18 @@ class Phrase:
         self.y_min += dy
         self.y_max += dy
 
+        # Keep the packed layout in step with the letters
+        if self._layout is not None:
+            self._layout[:, 0:6:2] += dx
+            self._layout[:, 1:6:2] += dy
+        self.mark_changed("position", "letters", "_layout")
+
     def get_letters(self):
         """Initial creation of the letters based on the text and position."""
         letters = []
         x, y = self.position
         for char in self.text:
-            if self.auto_newline and x > 128 - (8 * self.size):
+            if self.auto_newline and x > self._line_width - (8 * self.size):
                 x = self.position[0]
                 y += 8 * self.size
             letters.append(Letter(char, [x, y], self.color, size=self.size))
@@ -563,10 +968,11 @@ class Phrase:
 
     def update_letters(self, new_text: str):
         """Update only the letters that have changed, reusing existing ones where possible."""
+        self.layout_version += 1
         x, y = self.position
         new_letters = []
         for i, char in enumerate(new_text):
-            if self.auto_newline and x >= 128 - (8 * self.size):
+            if self.auto_newline and x >= self._line_width - (8 * self.size):
                 x = self.position[0]
                 y += 8 * self.size
             if i < len(self.letters):
@@ -586,13 +992,15 @@ class Phrase:
 
     def update_positions(self):
         """Update the positions of all letters based on the new starting position."""
+        self.layout_version += 1
         x, y = self.position
         for letter in self.letters:
             letter.set_position([x, y])
             x += 8 * self.size
-            if self.auto_newline and x >= 128 - (8 * self.size):
+            if self.auto_newline and x >= self._line_width - (8 * self.size):
                 x = self.position[0]
                 y += 8 * self.size
+        self.mark_changed("letters")
 
     def contains_points(self, points: np.ndarray):
         """Optimized containment check with bounding box"""
@@ -622,8 +1030,87 @@ class Phrase:
         result[valid_mask] = filtered_result
         return result
 
+    def rasterize(self, width: int, height: int):
+        """Combine the masks of the visible letters inside the phrase's bounding box."""
+        job = self._raster_job(width, height)
+        if job is None:
+            return None
+
+        key, origin, bbox, render, exclusive = job
+        return self._mask_cache.rasterize(key, origin, bbox, width, height, render, exclusive)
+
+    def _raster_job(self, width: int, height: int):
+        """Everything needed to rasterize the phrase over any pixel box, or None without letters."""
+        if self.auto_newline and self.wrap_width is None and self._line_width != width:
+            # Wrap to the canvas the phrase is actually drawn on
+            self._line_width = width
+            self.update_letters(self.text)
+            self._update_bounds()
+
+        if not self.letters:
+            return None
+        return self._raster_params() + (self._rasterize_box, True)
+
+    def _raster_params(self):
+        """Cache key, origin and bounding box used to rasterize the phrase."""
+        bbox = (self.x_min, self.y_min, self.x_max, self.y_max)
+        return (self.layout_version, id(self.letters)), (self.x_min, self.y_min), bbox
+
+    def _letter_layout(self):
+        """
+        Return the packed letter layout, rebuilding it only after the letters were laid out again.
+
+        Returns:
+        - layout (ndarray): A (n_letters, 7) array of x, y, x_min, y_min, x_max, y_max and scale.
+        - glyph (ndarray): The atlas index of every letter.
+        """
+        key = (self.layout_version, id(self.letters))
+        if self._layout_key != key:
+            self._layout = np.array([
+                (letter.position[0], letter.position[1], letter.x_min, letter.y_min,
+                 letter.x_max, letter.y_max, letter.scale)
+                for letter in self.letters
+            ], dtype=float).reshape(-1, 7)
+            self._glyphs = font.atlas.lookup_text("".join(letter.char for letter in self.letters))
+            self._layout_key = key
+        return self._layout, self._glyphs
+
+    def _rasterize_box(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Render every visible letter with a single gather from the glyph atlas."""
+        mask = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+
+        layout, glyph = self._letter_layout()
+        px, py, x_min, y_min, x_max, y_max, scale = layout.T
+
+        # Each letter's pixel span, clipped to the box
+        lx0 = np.maximum(np.ceil(x_min), x0)
+        ly0 = np.maximum(np.ceil(y_min), y0)
+        lx1 = np.minimum(np.ceil(x_max), x1)
+        ly1 = np.minimum(np.ceil(y_max), y1)
+        visible = (lx0 < lx1) & (ly0 < ly1)
+        if not np.any(visible):
+            return mask
+
+        px, py, scale, lx0, ly0, lx1, ly1 = (a[visible] for a in (px, py, scale, lx0, ly0, lx1, ly1))
+        glyph = glyph[visible]
+
+        # Canvas pixel columns/rows of each letter and the glyph cells they sample
+        cell = int(np.ceil(8 * scale.max())) + 1
+        cols = lx0[:, None] + np.arange(cell)
+        rows = ly0[:, None] + np.arange(cell)
+        rel_x = np.clip(((cols - px[:, None]) / scale[:, None]).astype(int), 0, 7)
+        rel_y = np.clip(((rows - py[:, None]) / scale[:, None]).astype(int), 0, 7)
+
+        covered = font.atlas.glyphs[glyph[:, None, None], rel_y[:, :, None], rel_x[:, None, :]]
+        covered &= (rows < ly1[:, None])[:, :, None] & (cols < lx1[:, None])[:, None, :]
+
+        # Letters are OR-ed together, so only set pixels are scattered
+        letter_index, row_index, col_index = np.nonzero(covered)
+        mask[rows[letter_index, row_index].astype(np.intp) - y0, cols[letter_index, col_index].astype(np.intp) - x0] = True
+        return mask
+
 
-class Pixel:
+class Pixel(Tracked):
     def __init__(self, position: list, color: list = [255, 255, 255], scale: int = 1):
         self.position = position
         self.color = color
@@ -646,6 +1133,14 @@ class Pixel:
         
         return valid_mask
 
+    def rasterize(self, width: int, height: int):
+        bounds = raster.clip_bounds(self.x_min, self.y_min, self.x_max, self.y_max, width, height, exclusive=True)
+        if bounds is None:
+            return None
+
+        x0, y0, x1, y1 = bounds
+        return x0, y0, np.ones((y1 - y0, x1 - x0), dtype=bool)
+
     def translate(self, dx: float, dy: float):
         self.position[0] += dx
         self.position[1] += dy
@@ -655,84 +1150,248 @@ class Pixel:
         self.x_max += dx
         self.y_min += dy
         self.y_max += dy
+        self.mark_changed("position")
 
     def __str__(self):
         return f"[{self.position[0]},{self.position[1]}] -> ({self.color[0]},{self.color[1]},{self.color[2]})"
 
 
-class ColoredBitMap:
+class ColoredBitMap(Tracked):
     def __init__(self, pixels: list, width: int, height: int, position: list = [0, 0], scale: int = 1):
+        """
+        Initializes a ColoredBitMap from a flat, row major list of colors.
+
+        Parameters:
+        - pixels (list): width * height RGB or RGBA colors; empty entries ([] or [None]) are transparent.
+        - width (int): The width of the bitmap in pixels.
+        - height (int): The height of the bitmap in pixels.
+        - position (list, optional): The top left corner on the canvas. Defaults to [0, 0].
+        - scale (int, optional): The size of each bitmap pixel on the canvas. Defaults to 1.
+
+        Attributes:
+        - colors (ndarray): A (height, width, 3) uint8 array of pixel colors.
+        - valid (ndarray): A (height, width) boolean array of the pixels that are drawn,
+          or None when every pixel is drawn.
+        - alpha (ndarray): A (height, width) uint8 array of pixel opacities, or None
+          when every drawn pixel is opaque.
+        """
         self.position = position
         self.width = width
         self.height = height
         self.scale = scale
-        self.pixels = []
+        self.set_pixels(pixels)
+
+    def set_pixels(self, pixels: list):
+        """Replace the bitmap contents with a flat, row major list of colors."""
+        colors = np.zeros((self.height * self.width, 3), dtype=np.uint8)
+        alpha = np.zeros(self.height * self.width, dtype=np.uint8)
+
+        for i, color in enumerate(pixels[:self.height * self.width]):
+            if color and color != [None]:  # Skip empty pixels
+                colors[i] = color[:3]
+                alpha[i] = color[3] if len(color) > 3 else 255
+
+        self.set_arrays(colors.reshape(self.height, self.width, 3), alpha=alpha.reshape(self.height, self.width))
+
+    def set_arrays(self, colors: np.ndarray, valid: np.ndarray = None, alpha: np.ndarray = None):
+        """
+        Replace the bitmap contents with arrays.
+
+        Parameters:
+        - colors (ndarray): A (height, width, 3) uint8 array of pixel colors.
+        - valid (ndarray, optional): A (height, width) boolean array of the pixels that are
+          drawn. Defaults to None (every pixel is drawn).
+        - alpha (ndarray, optional): A (height, width) uint8 array of pixel opacities; pixels
+          with alpha 0 are not drawn. Defaults to None (every drawn pixel is opaque).
+        """
+        if alpha is not None:
+            if valid is not None:
+                alpha = np.where(valid, alpha, 0).astype(np.uint8)
+            valid = alpha > 0
+
+            # Alpha that is only ever 0 or 255 is just a validity mask
+            if ((alpha == 0) | (alpha == 255)).all():
+                alpha = None
+
+        if valid is not None and valid.all():
+            valid = None
+
+        self.colors = colors
+        self.valid = valid
+        self.alpha = alpha
+        self.height, self.width = colors.shape[:2]
+
+        # Upscaled copies of the arrays, rebuilt when the contents or the scale change
+        self._scaled = None
 
-        for i in range(len(pixels)):
-            if pixels[i] != [] and pixels[i] != [None]:  # Skip empty pixels
-                x = (i % width) * scale + position[0]
-                y = (i // width) * scale + position[1]
-                self.pixels.append(Pixel([x, y], pixels[i], scale))
-                
         # Precompute bounds
         self._update_bounds()
-        
+
+    @property
+    def pixels(self) -> list:
+        """The drawn pixels as a list of Pixel objects (built on demand)."""
+        ys, xs = np.nonzero(self._valid_grid())
+        colors = self.colors if self.alpha is None else np.dstack((self.colors, self.alpha))
+        return [
+            Pixel([x * self.scale + self.position[0], y * self.scale + self.position[1]],
+                  tuple(int(c) for c in colors[y, x]), self.scale)
+            for y, x in zip(ys, xs)
+        ]
+
+    def _mask_grid(self) -> np.ndarray:
+        """The alpha array when some pixels are translucent, otherwise the validity mask (or None)."""
+        return self.valid if self.alpha is None else self.alpha
+
+    def _valid_grid(self) -> np.ndarray:
+        if self.valid is None:
+            return np.ones((self.height, self.width), dtype=bool)
+        return self.valid
+
     def _update_bounds(self):
         """Calculate bitmap bounds for faster containment checks"""
-        if not self.pixels:
+        valid = self._valid_grid()
+        cols = np.flatnonzero(valid.any(axis=0))
+        rows = np.flatnonzero(valid.any(axis=1))
+
+        if len(cols) == 0:
             self.x_min = self.position[0]
             self.y_min = self.position[1]
             self.x_max = self.position[0] + self.width * self.scale
             self.y_max = self.position[1] + self.height * self.scale
             return
-            
-        self.x_min = min(pixel.x_min for pixel in self.pixels)
-        self.y_min = min(pixel.y_min for pixel in self.pixels)
-        self.x_max = max(pixel.x_max for pixel in self.pixels)
-        self.y_max = max(pixel.y_max for pixel in self.pixels)
-        
+
+        self.x_min = self.position[0] + cols[0] * self.scale
+        self.y_min = self.position[1] + rows[0] * self.scale
+        self.x_max = self.position[0] + (cols[-1] + 1) * self.scale
+        self.y_max = self.position[1] + (rows[-1] + 1) * self.scale
+
     def contains_points(self, points: np.ndarray):
         """Optimized containment check with bounding box"""
         # Quick bounds check
         valid_mask = (
             (points[:, 0] >= self.x_min) &
-            (points[:, 0] <= self.x_max) &
+            (points[:, 0] < self.x_max) &
             (points[:, 1] >= self.y_min) &
-            (points[:, 1] <= self.y_max)
+            (points[:, 1] < self.y_max)
         )
         
         if not np.any(valid_mask):
             return np.zeros(len(points), dtype=bool)
-            
-        # Check each pixel (only for points within bitmap bounds)
+
+        # Look up the bitmap pixel under each point
+        inside = points[valid_mask]
+        rel_x = np.clip(((inside[:, 0] - self.position[0]) // self.scale).astype(int), 0, self.width - 1)
+        rel_y = np.clip(((inside[:, 1] - self.position[1]) // self.scale).astype(int), 0, self.height - 1)
+
         result = np.zeros(len(points), dtype=bool)
-        
-        for pixel in self.pixels:
-            pixel_result = pixel.contains_points(points)
-            result = np.logical_or(result, pixel_result)
-            
+        result[valid_mask] = self._valid_grid()[rel_y, rel_x]
         return result
+
+    def scaled_arrays(self):
+        """
+        Return the colors and mask upscaled by the integer scale.
+
+        The upscaled arrays are built once and reused until the contents or the
+        scale change. At scale 1 the arrays themselves are returned.
+
+        Returns:
+        - (colors, mask) with colors of shape (height * scale, width * scale, 3)
+          and mask None (every pixel opaque), a boolean validity mask or a uint8
+          alpha array of shape (height * scale, width * scale).
+        """
+        scale = int(self.scale)
+        if self._scaled is None or self._scaled[0] != scale:
+            colors = self.colors
+            mask = self._mask_grid()
+            if scale > 1:
+                colors = colors.repeat(scale, axis=0).repeat(scale, axis=1)
+                if mask is not None:
+                    mask = mask.repeat(scale, axis=0).repeat(scale, axis=1)
+            self._scaled = (scale, colors, mask)
+
+        return self._scaled[1], self._scaled[2]
+
+    def __getstate__(self):
+        """The upscaled arrays are rebuilt rather than pickled."""
+        state = self.__dict__.copy()
+        state["_scaled"] = None
+        return state
+
+    def rasterize_colors(self, width: int, height: int):
+        """
+        Find the part of the bitmap that lands on a canvas.
+
+        Parameters:
+        - width (int): The width of the canvas.
+        - height (int): The height of the canvas.
+
+        Returns:
+        - (x0, y0, colors, mask) where colors is an (h, w, 3) array for the canvas
+          region starting at (x0, y0) and mask is None when every pixel is drawn
+          opaque, an (h, w) boolean array of the drawn pixels, or an (h, w) uint8
+          alpha array. Returns None if the bitmap is off-canvas.
+        """
+        px, py = self.position
+        scale = self.scale
+
+        # Whole-pixel placement: slice the cached upscaled arrays
+        if px == int(px) and py == int(py) and scale == int(scale) and scale >= 1:
+            px, py, scale = int(px), int(py), int(scale)
+            bounds = raster.clip_bounds(
+                px, py, px + self.width * scale, py + self.height * scale, width, height, exclusive=True
+            )
+            if bounds is None:
+                return None
+
+            x0, y0, x1, y1 = bounds
+            colors, mask = self.scaled_arrays()
+            colors = colors[y0 - py:y1 - py, x0 - px:x1 - px]
+            if mask is not None:
+                mask = mask[y0 - py:y1 - py, x0 - px:x1 - px]
+            return x0, y0, colors, mask
+
+        # Fractional placement: each bitmap pixel starts at int(index * scale + position)
+        # and covers max(1, int(scale)) canvas pixels, later pixels drawing over earlier ones
+        size = max(1, int(scale))
+        rows, cols = np.nonzero(self._valid_grid())
+        if len(rows) == 0:
+            return None
+
+        xs = ((cols * scale + px).astype(int)[:, None] + np.arange(size)).repeat(size, axis=1).ravel()
+        ys = ((rows * scale + py).astype(int)[:, None] + np.arange(size)).repeat(size, axis=0).ravel()
+        bounds = raster.clip_bounds(xs.min(), ys.min(), xs.max() + 1, ys.max() + 1, width, height, exclusive=True)
+        if bounds is None:
+            return None
+
+        x0, y0, x1, y1 = bounds
+        pixel_colors = self.colors[rows, cols].repeat(size * size, axis=0)
+        on_canvas = (xs >= x0) & (xs < x1) & (ys >= y0) & (ys < y1)
+        xs, ys, pixel_colors = xs[on_canvas] - x0, ys[on_canvas] - y0, pixel_colors[on_canvas]
+
+        colors = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.uint8)
+        colors[ys, xs] = pixel_colors
+        if self.alpha is None:
+            mask = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+            mask[ys, xs] = True
+        else:
+            mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+            mask[ys, xs] = self.alpha[rows, cols].repeat(size * size)[on_canvas]
+        return x0, y0, colors, mask
         
     def translate(self, dx: float, dy: float):
-        """Move all pixels and update bounds"""
-        for pixel in self.pixels:
-            pixel.translate(dx, dy)
-            
+        """Move the bitmap and update bounds"""
         self.position[0] += dx
         self.position[1] += dy
         
         # Update bounds
-        if hasattr(self, 'x_min'):
-            self.x_min += dx
-            self.x_max += dx
-            self.y_min += dy
-            self.y_max += dy
-
+        self.x_min += dx
+        self.x_max += dx
+        self.y_min += dy
+        self.y_max += dy
+        self.mark_changed("position")
 
-# Global character cache for Letter class
-char_mask_cache = {}
 
-class BitMap:
+class BitMap(Tracked):
     def __init__(self, pixels: list, width: int, height: int, position: list = [0, 0], color: list = (255, 255, 255), scale: int = 1):
         self.pixels = pixels
         self.position = position
@@ -740,6 +1399,10 @@ class BitMap:
         self.height = height
         self.scale = scale
         self.color = color
+        self.bitmap_version = 0
+
+        # Last coverage mask, reused while the bitmap only moves by whole pixels
+        self._mask_cache = raster.MaskCache()
 
         # Cache for contains_points
         self.cached_points = None
@@ -770,6 +1433,12 @@ class BitMap:
         # Save active indices for faster lookups
         self.active_indices = active_indices
 
+        # Active pixels as a (height, width) grid for rasterize
+        self.bitmap_version += 1
+        active_grid = np.zeros(self.width * self.height, dtype=bool)
+        active_grid[active_indices[active_indices < active_grid.size]] = True
+        self.active_grid = active_grid.reshape(self.height, self.width)
+
     def _get_valid_points_mask(self, points, x_min, y_min, x_max, y_max):
         """Helper to check if points are within a bounding box"""
         return (
@@ -782,8 +1451,7 @@ class BitMap:
     def contains_points(self, points: np.ndarray):
         """Check if points are contained within any active pixels of the bitmap"""
         # Quick bounding box check
-        if (self.x_min > 128 or self.y_min > 128 or
-            self.x_max < 0 or self.y_max < 0):
+        if self.x_max < 0 or self.y_max < 0:
             return np.zeros(points.shape[0], dtype=bool)
         
         # Check overall bounding box
@@ -828,6 +1496,25 @@ class BitMap:
         
         return result
 
+    def rasterize(self, width: int, height: int):
+        """Sample the active pixel grid for every canvas pixel in the bitmap's clipped bounds."""
+        key, origin, bbox, render, exclusive = self._raster_job(width, height)
+        return self._mask_cache.rasterize(key, origin, bbox, width, height, render, exclusive)
+
+    def _raster_job(self, width: int, height: int):
+        """Everything needed to rasterize the bitmap over any pixel box (see Polygon._raster_job)."""
+        return self._raster_params() + (self._rasterize_box, True)
+
+    def _raster_params(self):
+        """Cache key, origin and bounding box used to rasterize the bitmap."""
+        bbox = (self.x_min, self.y_min, self.x_max, self.y_max)
+        return (self.bitmap_version, self.scale), self.position, bbox
+
+    def _rasterize_box(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        rel_x = ((np.arange(x0, x1) - self.position[0]) / self.scale).astype(int)
+        rel_y = ((np.arange(y0, y1) - self.position[1]) / self.scale).astype(int)
+        return self.active_grid[rel_y[:, None], rel_x[None, :]]
+
     def translate(self, dx: float, dy: float):
         """Translate the bitmap by dx, dy and update cached values"""
         self.position[0] += dx
@@ -838,6 +1525,7 @@ class BitMap:
         self.x_max += dx
         self.y_min += dy
         self.y_max += dy
+        self.mark_changed("position")
 
     def set_bitmap(self, pixels: list, width: int, height: int):
         """Update the bitmap with new pixel data"""
@@ -877,61 +1565,216 @@ class BitMap:
         )
 
 
+class ImageCache:
+    """
+    LRU cache of decoded image files, so artwork that is loaded again (menus,
+    slideshows) skips decoding and resizing entirely.
+
+    Entries are keyed on the file path, its modification time, the target size
+    and the scale, and hold read-only color (and transparency) arrays shared
+    by every Image that loads them.
+
+    Attributes:
+    - enabled (bool): Turn the cache on or off. Defaults to True.
+    - max_bytes (int): Memory budget for all cached images.
+    - hits, misses, evictions (int): Usage counters.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        self.enabled = True
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, max_bytes: int = None, enabled: bool = None) -> None:
+        """Change the memory budget or turn the cache on or off."""
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        if enabled is not None:
+            self.enabled = enabled
+        self._evict()
+
+    def get(self, key):
+        """Return the cached (colors, scaled_colors, mask, scaled_mask) for key, or None."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, colors: np.ndarray, scaled_colors: np.ndarray,
+            mask: np.ndarray = None, scaled_mask: np.ndarray = None) -> None:
+        """
+        Store read-only decoded (and upscaled) arrays for key.
+
+        mask and scaled_mask are None for opaque images, otherwise a boolean
+        validity mask or a uint8 alpha array (see ColoredBitMap.scaled_arrays).
+        """
+        if key in self.entries:
+            self.bytes -= self._entry_bytes(self.entries.pop(key))
+
+        entry = (colors, scaled_colors, mask, scaled_mask)
+        for array in entry:
+            if array is not None:
+                array.flags.writeable = False
+        self.entries[key] = entry
+        self.bytes += self._entry_bytes(entry)
+        self._evict()
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self.entries.clear()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        """Return the cache counters and memory use."""
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _entry_bytes(self, entry) -> int:
+        # At scale 1 the scaled arrays are the arrays themselves
+        unique = {id(array): array for array in entry if array is not None}
+        return sum(array.nbytes for array in unique.values())
+
+    def _evict(self) -> None:
+        while self.entries and self.bytes > self.max_bytes:
+            _, entry = self.entries.popitem(last=False)
+            self.bytes -= self._entry_bytes(entry)
+            self.evictions += 1
+
+
+# Decoded image files shared by every Image
+image_cache = ImageCache()
+
+
 class Image(ColoredBitMap):
     def __init__(self, width: int, height: int, position: list = [0, 0], scale: int = 1):
         super().__init__(pixels=[], width=width, height=height, position=position, scale=scale)
 
+    @classmethod
+    def from_array(cls, array: np.ndarray, position: list = None, scale: int = 1):
+        """
+        Create an Image that wraps an existing array of pixels.
+
+        A uint8 array of shape (H, W, 3) or (H, W, 4) is used without copying.
+        Other dtypes are converted once, and (H, W) grayscale arrays are expanded
+        to three channels. For RGBA arrays the alpha channel is blended onto the
+        canvas; pixels with alpha 0 are not drawn.
+
+        Parameters:
+        - array (ndarray): The pixels, row major.
+        - position (list, optional): The top left corner on the canvas. Defaults to [0, 0].
+        - scale (int, optional): The size of each image pixel on the canvas. Defaults to 1.
+
+        Returns:
+        - image (Image): An Image backed by the array.
+        """
+        array = np.asarray(array)
+        if array.dtype != np.uint8:
+            array = np.clip(array, 0, 255).astype(np.uint8)
+        if array.ndim == 2:
+            array = np.repeat(array[:, :, None], 3, axis=2)
+        if array.ndim != 3 or array.shape[2] not in (3, 4):
+            raise ValueError("Image arrays must have shape (H, W), (H, W, 3) or (H, W, 4).")
+
+        # set_arrays sizes the image, so skip the blank pixels __init__ would allocate
+        image = cls.__new__(cls)
+        image.position = [0, 0] if position is None else list(position)
+        image.scale = scale
+        if array.shape[2] == 4:
+            image.set_arrays(array[:, :, :3], alpha=array[:, :, 3])
+        else:
+            image.set_arrays(array)
+        return image
+
+    @classmethod
+    def from_pil(cls, img, position: list = None, scale: int = 1):
+        """
+        Create an Image from a PIL image.
+
+        RGB and RGBA images are read in a single bulk copy; other modes are
+        converted to RGB (or RGBA when they carry transparency) first.
+
+        Parameters:
+        - img (PIL.Image.Image): The image to show.
+        - position (list, optional): The top left corner on the canvas. Defaults to [0, 0].
+        - scale (int, optional): The size of each image pixel on the canvas. Defaults to 1.
+
+        Returns:
+        - image (Image): An Image backed by the image's pixels.
+        """
+        if img.mode not in ("RGB", "RGBA"):
+            has_alpha = img.mode in ("LA", "PA") or "transparency" in img.info
+            img = img.convert("RGBA" if has_alpha else "RGB")
+        return cls.from_array(np.asarray(img), position, scale)
+
     def loadfile(self, filename: str):
-        """Load image from file and convert to pixels"""
+        """Load image from file (or the image cache) into the color array"""
         if os.path.exists(filename):
+            key = (os.path.abspath(filename), os.stat(filename).st_mtime_ns, self.width, self.height, self.scale)
+            cached = image_cache.get(key) if image_cache.enabled else None
+            if cached is not None:
+                colors, scaled_colors, mask, scaled_mask = cached
+                if mask is not None and mask.dtype == bool:
+                    self.set_arrays(colors, valid=mask)
+                else:
+                    self.set_arrays(colors, alpha=mask)
+                self._scaled = (int(self.scale), scaled_colors, scaled_mask)
+                return
+
             imgsurface = pygame.image.load(filename)
 
             # check to make sure size matches
             if(imgsurface.get_height() != self.height or imgsurface.get_width() != self.width):
                 imgsurface = pygame.transform.scale(imgsurface,(self.width,self.height))
-            
-            # Clear existing pixels
-            self.pixels = []
-            
-            # Loop through and make a bitmap of pixels
-            for x in range(0,self.width):
-                for y in range(0,self.height):
-                    pos_x = x * self.scale + self.position[0]
-                    pos_y = y * self.scale + self.position[1]
-                    color = tuple(imgsurface.get_at((x,y))[0:3])
-                    self.pixels.append(Pixel([pos_x, pos_y], color=color, scale=self.scale))
-                    
-            # Update bounds
-            self._update_bounds()
+
+            # Copy all pixels at once; surfarray is indexed (x, y)
+            colors = np.ascontiguousarray(pygame.surfarray.array3d(imgsurface).transpose(1, 0, 2))
+            alpha = None
+            if imgsurface.get_flags() & pygame.SRCALPHA:
+                alpha = np.ascontiguousarray(pygame.surfarray.array_alpha(imgsurface).T)
+            self.set_arrays(colors, alpha=alpha)
+
+            if image_cache.enabled:
+                scaled_colors, scaled_mask = self.scaled_arrays()
+                image_cache.put(key, colors, scaled_colors, self._mask_grid(), scaled_mask)
         else:
             print(f"File {filename} does not exist. Try again.")
     
     def loadpixels(self, pixels: list):
-        # Clear existing pixels
-        self.pixels = []
-        
-        # Create new pixels
-        for i, color in enumerate(pixels):
-            if color and color != [None]:  # Skip empty pixels
-                x = (i % self.width) * self.scale + self.position[0]
-                y = (i // self.width) * self.scale + self.position[1]
-                self.pixels.append(Pixel([x, y], color=color, scale=self.scale))
-                
-        # Update bounds
-        self._update_bounds()
+        """Load a flat, row major list of colors (empty entries are transparent)"""
+        self.set_pixels(pixels)
 
 
 class Letter(BitMap):
     def __init__(self, char: str, position: list = [0, 0], color: list = [255, 255, 255], size: int = 1):
         # Default mask (blank)
         self.char = ""
-        self.mask = [False] * 64
+        self.glyph_index = font.atlas.blank
+        self.mask = font.atlas.glyphs[self.glyph_index].reshape(64)
         self.position = list(position)
         self.color = color
         self.size = size
         
         # Initialize bitmap with default mask
         super().__init__(self.mask, 8, 8, position, color, size)
+
+        # Glyph masks are shared by every letter with the same character and size
+        self._mask_cache = raster.MaskCache(shareable=True)
         
         # Set the actual character
         self.set_char(char)
@@ -943,23 +1786,21 @@ class Letter(BitMap):
             
         self.char = new_char
         
-        # Use cached mask if available
-        if new_char in char_mask_cache:
-            self.mask = char_mask_cache[new_char]
-        else:
-            # Get from utils or use default pattern
-            if new_char in utils.char_mask:
-                self.mask = utils.char_mask[new_char]
-            else:
-                # Checkered pattern for unknown characters
-                self.mask = [((i + j) % 2 == 1) for i in range(8) for j in range(8)]
-                
-            # Cache for future use
-            char_mask_cache[new_char] = self.mask
+        # Glyphs come from the compiled font atlas (checkered for unknown characters)
+        self.glyph_index = font.atlas.lookup(new_char)
+        self.mask = font.atlas.glyphs[self.glyph_index].reshape(64)
             
         # Update bitmap with new mask
         self.set_bitmap(self.mask, 8, 8)
 
+    def _precompute_active_pixels(self):
+        """Take the active pixels straight from the glyph atlas"""
+        self.bitmap_version += 1
+        self.active_grid = font.atlas.glyphs[self.glyph_index]
+        self.active_indices = np.flatnonzero(self.active_grid)
+        self.active_x = self.active_indices % 8
+        self.active_y = self.active_indices // 8
+
     def contains_points(self, points: np.ndarray):
         """Optimized letter containment check"""
         # Use pre-computed bounds from parent class
@@ -985,8 +1826,7 @@ class Letter(BitMap):
         indices = rel_y * 8 + rel_x
         
         # Check mask values
-        mask_array = np.array(self.mask)
-        mask_values = mask_array[indices]
+        mask_values = self.mask[indices]
         
         # Map results back to original points
         result = np.zeros(points.shape[0], dtype=bool)
@@ -994,6 +1834,21 @@ class Letter(BitMap):
         
         return result
 
+    def _raster_params(self):
+        """Cache key, origin and bounding box used to rasterize the letter."""
+        bbox = (self.x_min, self.y_min, self.x_max, self.y_max)
+        return (self.glyph_index, self.scale), self.position, bbox
+
+    def _rasterize_box(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Slice the pre-scaled glyph when the letter sits on whole pixels."""
+        px, py = self.position
+        if px == int(px) and py == int(py) and self.scale == int(self.scale):
+            px, py = int(px), int(py)
+            glyph = font.atlas.scaled(int(self.scale))[self.glyph_index]
+            return glyph[y0 - py:y1 - py, x0 - px:x1 - px]
+
+        return super()._rasterize_box(x0, y0, x1, y1)
+
     def set_position(self, new_position: list):
         """Update position"""
         if new_position == self.position: